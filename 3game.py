@@ -1,16 +1,28 @@
+import os
+
+# The import banner would end up in a raw capture streamed to stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
 import pygame
 import random
 import sys
-import os
-
-# Initialize Pygame and Mixer (for sound)
-pygame.init()
-pygame.mixer.init()
+import math
+import time
+import argparse
+from array import array
+import threading
+import bisect
+import csv
+import json
+import queue
+import struct
+from collections import OrderedDict, namedtuple
 
-# Game Constants
-WINDOW_WIDTH = 400
-WINDOW_HEIGHT = 600
-FPS = 60
+import replay
+import simulation
+from autopilot import Autopilot
+from simulation import (WINDOW_WIDTH, WINDOW_HEIGHT, GROUND_HEIGHT, FPS,
+                        EVENT_JUMP, EVENT_POINT, EVENT_HIT)
 
 # Colors - Aesthetic Gradient Theme
 SKY_TOP = (255, 183, 197)  # Soft pink
@@ -26,544 +38,2235 @@ RED = (220, 20, 60)
 GOLD = (255, 215, 0)
 PARTICLE_COLORS = [(255, 182, 193), (173, 216, 230), (221, 160, 221), (255, 218, 185)]
 
-# Game Settings
-GRAVITY = 0.5
-JUMP_STRENGTH = -10
-PIPE_SPEED = 3
-PIPE_GAP = 150
-PIPE_FREQUENCY = 90
+
+# Events after which the window may have lost its contents and needs a full repaint
+REPAINT_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED)
+# The only events the game reacts to; everything else is kept out of the queue
+INPUT_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, *REPAINT_EVENTS]
+JUMP_KEYS = (pygame.K_SPACE,)
+
+
+def init_display():
+    """Bring up the video and font subsystems needed to play."""
+    pygame.display.init()
+    pygame.font.init()
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(INPUT_EVENTS)
+
+
+def is_jump(event):
+    """Check if an input event is a jump: SPACE or any mouse button."""
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return True
+    return event.type == pygame.KEYDOWN and event.key in JUMP_KEYS
+
+
+# Mixer settings: signed 16-bit stereo with a small buffer for low latency
+AUDIO_FREQUENCY = 44100
+AUDIO_SIZE = -16
+AUDIO_CHANNELS = 2
+AUDIO_BUFFER = 256  # samples, about 6 ms at 44.1 kHz
+
+mixer_failed = False
+
+
+def init_mixer():
+    """Bring up audio, once. Returns False if there is no usable audio device."""
+    global mixer_failed
+    if pygame.mixer.get_init():
+        return True
+    if mixer_failed:
+        return False
+    try:
+        pygame.mixer.init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, AUDIO_BUFFER)
+    except pygame.error as e:
+        print(f"✗ No audio device, game will run without sound: {e}")
+        mixer_failed = True
+        return False
+    return True
+
+
+class AssetManager:
+    """Loads images and sounds once and keeps them in memory.
+    
+    preload() decodes files on a background thread. image() scales and
+    converts to the display format on first use at each size, on the calling
+    thread, and caches the result by (path, size). poll() reloads files whose
+    modification time changed. Each finished batch bumps self.version so
+    callers can pick up new or reloaded assets.
+    """
+    
+    IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+    POLL_INTERVAL = 1.0
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.decoded = {}  # path -> Surface or Sound, None if loading failed
+        self.converted = {}  # (path, size) -> Surface in the display format
+        self.mtimes = {}
+        self.loading = set()
+        self.listings = {}
+        self.worker = None
+        self.version = 0
+        self.next_poll = 0.0
+    
+    def find(self, names, directory="."):
+        """Get the absolute path of the first name that exists in directory."""
+        directory = os.path.abspath(directory)
+        listing = self.listings.get(directory)
+        if listing is None:
+            # One directory listing instead of an exists() check per name
+            try:
+                listing = set(os.listdir(directory))
+            except OSError:
+                listing = set()
+            self.listings[directory] = listing
+        for name in names:
+            if name in listing:
+                return os.path.join(directory, name)
+        return None
+    
+    def preload(self, paths):
+        """Start decoding paths on a background thread."""
+        with self.lock:
+            paths = [path for path in paths
+                     if path and path not in self.decoded and path not in self.loading]
+            if not paths:
+                return
+            self.loading.update(paths)
+        self.wait()
+        self.worker = threading.Thread(target=self.load_all, args=(paths,), daemon=True)
+        self.worker.start()
+    
+    def wait(self):
+        """Block until the background thread has finished."""
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+    
+    def load_all(self, paths):
+        """Decode every path, then bump the version."""
+        for path in paths:
+            self.load(path)
+        with self.lock:
+            self.version += 1
+    
+    def load(self, path):
+        """Decode one file from disk into the cache."""
+        name = os.path.basename(path)
+        # Taken before decoding so a file that fails to decode is only
+        # retried once it changes again
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        try:
+            if path.lower().endswith(self.IMAGE_EXTENSIONS):
+                asset = pygame.image.load(path)
+            elif init_mixer():
+                asset = pygame.mixer.Sound(path)
+            else:
+                asset = None
+            if asset is not None:
+                print(f"✓ Loaded: {name}")
+        except (OSError, pygame.error) as e:
+            print(f"✗ Failed to load {name}: {e}")
+            asset = None
+        with self.lock:
+            self.decoded[path] = asset
+            self.mtimes[path] = mtime
+            self.loading.discard(path)
+            for key in [key for key in self.converted if key[0] == path]:
+                del self.converted[key]
+        return asset
+    
+    def get(self, path, wait=True):
+        """Get a decoded asset, loading it now if it is not cached.
+        
+        With wait=False, returns None instead of blocking on disk I/O.
+        """
+        with self.lock:
+            if path in self.decoded:
+                return self.decoded[path]
+            loading = path in self.loading
+        if not wait:
+            return None
+        if loading:
+            self.wait()
+            return self.decoded.get(path)
+        return self.load(path)
+    
+    def image(self, path, size=None, wait=True):
+        """Get an image scaled to size and converted to the display format."""
+        if not path:
+            return None
+        key = (path, size)
+        # load() on the worker thread drops stale conversions under the lock
+        with self.lock:
+            image = self.converted.get(key)
+        if image is not None:
+            return image
+        image = self.get(path, wait)
+        if image is None:
+            return None
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        image = image.convert_alpha()
+        with self.lock:
+            self.converted[key] = image
+        return image
+    
+    def sound(self, path, wait=True):
+        """Get a loaded sound."""
+        if not path:
+            return None
+        return self.get(path, wait)
+    
+    def poll(self):
+        """Reload files that changed on disk, at most once per POLL_INTERVAL."""
+        now = time.perf_counter()
+        if now < self.next_poll or self.loading:
+            return
+        self.next_poll = now + self.POLL_INTERVAL
+        changed = []
+        for path, mtime in list(self.mtimes.items()):
+            try:
+                current = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if current != mtime:
+                changed.append(path)
+        if changed:
+            with self.lock:
+                for path in changed:
+                    del self.decoded[path]
+            self.preload(changed)
+
+
+assets = AssetManager()
+
 
 class Cloud:
     """Decorative cloud."""
     
-    def __init__(self):
-        self.x = random.randint(0, WINDOW_WIDTH)
-        self.y = random.randint(50, 250)
-        self.speed = random.uniform(0.3, 0.8)
-        self.size = random.randint(30, 60)
+    shapes = {}  # size -> pre-baked cloud surface
+    
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.x = rng.randint(0, WINDOW_WIDTH)
+        self.y = rng.randint(50, 250)
+        self.speed = rng.uniform(0.3, 0.8)
+        self.size = rng.randint(30, 60)
+        self.prev_x = self.x
     
     def update(self):
         """Move cloud."""
+        self.prev_x = self.x
         self.x -= self.speed
         if self.x < -100:
             self.x = WINDOW_WIDTH + 50
-            self.y = random.randint(50, 250)
+            self.prev_x = self.x
+            self.y = self.rng.randint(50, 250)
     
-    def draw(self, screen):
-        """Draw cloud."""
-        # Create cloud shape with multiple circles
-        surface = pygame.Surface((self.size * 3, self.size), pygame.SRCALPHA)
-        pygame.draw.circle(surface, CLOUD_COLOR, (self.size, self.size//2), self.size//2)
-        pygame.draw.circle(surface, CLOUD_COLOR, (self.size * 2, self.size//2), self.size//2)
-        pygame.draw.circle(surface, CLOUD_COLOR, (int(self.size * 1.5), 0), self.size//2)
-        screen.blit(surface, (int(self.x), int(self.y)))
+    def shape(self):
+        """Get the cloud shape for this size, baking it on first use."""
+        surface = self.shapes.get(self.size)
+        if surface is None:
+            # Create cloud shape with multiple circles
+            surface = pygame.Surface((self.size * 3, self.size), pygame.SRCALPHA)
+            pygame.draw.circle(surface, CLOUD_COLOR, (self.size, self.size//2), self.size//2)
+            pygame.draw.circle(surface, CLOUD_COLOR, (self.size * 2, self.size//2), self.size//2)
+            pygame.draw.circle(surface, CLOUD_COLOR, (int(self.size * 1.5), 0), self.size//2)
+            self.shapes[self.size] = surface
+        return surface
+    
+    def sprites(self, alpha=1.0):
+        """Get the cloud blits, interpolated `alpha` of the way from its last position."""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        return [(self.shape(), (int(x), int(self.y)))]
+    
+    def draw(self, screen, alpha=1.0):
+        """Draw cloud, interpolated `alpha` of the way from its last position."""
+        screen.blits(self.sprites(alpha), False)
 
 
 class Star:
     """Twinkling star particle."""
     
-    def __init__(self):
-        self.x = random.randint(0, WINDOW_WIDTH)
-        self.y = random.randint(0, WINDOW_HEIGHT - 100)
-        self.size = random.randint(1, 3)
-        self.twinkle = random.randint(0, 60)
-        self.color_index = random.randint(0, len(PARTICLE_COLORS) - 1)
+    TWINKLE_CYCLE = 120
+    strips = {}  # (size, color index) -> surface per twinkle step, None when dark
+    
+    def __init__(self, rng=random):
+        self.x = rng.randint(0, WINDOW_WIDTH)
+        self.y = rng.randint(0, WINDOW_HEIGHT - 100)
+        self.size = rng.randint(1, 3)
+        self.twinkle = rng.randint(0, 60)
+        self.color_index = rng.randint(0, len(PARTICLE_COLORS) - 1)
     
     def update(self):
         """Update twinkle effect."""
-        self.twinkle = (self.twinkle + 1) % 120
+        self.twinkle = (self.twinkle + 1) % self.TWINKLE_CYCLE
+    
+    def strip(self):
+        """Get the twinkle strip for this size and color, baking it on first use."""
+        key = (self.size, self.color_index)
+        strip = self.strips.get(key)
+        if strip is None:
+            frames = {}
+            strip = []
+            for twinkle in range(self.TWINKLE_CYCLE):
+                alpha = abs(self.TWINKLE_CYCLE // 2 - twinkle) * 4
+                if alpha <= 0:
+                    strip.append(None)
+                    continue
+                surface = frames.get(alpha)
+                if surface is None:
+                    color = PARTICLE_COLORS[self.color_index] + (min(alpha, 255),)
+                    surface = pygame.Surface((self.size * 4, self.size * 4), pygame.SRCALPHA)
+                    pygame.draw.circle(surface, color, (self.size * 2, self.size * 2), self.size)
+                    frames[alpha] = surface
+                strip.append(surface)
+            self.strips[key] = strip
+        return strip
+    
+    def sprites(self):
+        """Get the star blits with twinkle effect."""
+        surface = self.strip()[self.twinkle]
+        if surface is None:
+            return []
+        return [(surface, (int(self.x - self.size * 2), int(self.y - self.size * 2)))]
     
     def draw(self, screen):
         """Draw star with twinkle effect."""
-        alpha = abs(60 - self.twinkle) * 4
-        if alpha > 0:
-            color = PARTICLE_COLORS[self.color_index] + (min(alpha, 255),)
-            surface = pygame.Surface((self.size * 4, self.size * 4), pygame.SRCALPHA)
-            pygame.draw.circle(surface, color, (self.size * 2, self.size * 2), self.size)
-            screen.blit(surface, (int(self.x - self.size * 2), int(self.y - self.size * 2)))
-
-
-class Particle:
-    """Jump particle effect."""
-    
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.velocity_x = random.uniform(-2, 2)
-        self.velocity_y = random.uniform(-3, -1)
-        self.life = 30
-        self.size = random.randint(2, 5)
-        self.color = random.choice(PARTICLE_COLORS)
+        screen.blits(self.sprites(), False)
+
+
+class AmbientLayer:
+    """Stars and clouds at one parallax depth, drawn from pre-baked sprites.
+    
+    A layer at depth 0 stays put behind the game; at depth 1 it scrolls
+    with the pipes, wrapping around the screen. Each object costs one
+    cached surface lookup per frame, however many there are.
+    """
+    
+    # Clouds wrap around between these x positions, like Cloud.update
+    CLOUD_LEFT = -100
+    CLOUD_RIGHT = WINDOW_WIDTH + 50
+    
+    def __init__(self, stars=20, clouds=5, depth=0.0, rng=random):
+        self.clouds = [Cloud(rng) for _ in range(clouds)]
+        self.stars = [Star(rng) for _ in range(stars)]
+        self.depth = depth
+        self.offset = 0.0
+        self.prev_offset = 0.0
+    
+    def update(self, scrolling):
+        """Advance twinkles and clouds, and the parallax scroll while the pipes move."""
+        for cloud in self.clouds:
+            cloud.update()
+        for star in self.stars:
+            star.update()
+        self.prev_offset = self.offset
+        if scrolling and self.depth:
+            self.offset = (self.offset + simulation.PIPE_SPEED * self.depth) % WINDOW_WIDTH
+    
+    def shift(self, alpha):
+        """Get the parallax offset interpolated `alpha` of the way from the last update."""
+        delta = (self.offset - self.prev_offset) % WINDOW_WIDTH
+        return self.prev_offset + delta * alpha
+    
+    def star_sprites(self, count, alpha=1.0):
+        """Get blits of the first `count` stars."""
+        shift = self.shift(alpha) if self.depth else 0
+        blits = []
+        for star in self.stars[:count]:
+            for surface, (x, y) in star.sprites():
+                if shift:
+                    x = int(x - shift) % WINDOW_WIDTH
+                blits.append((surface, (x, y)))
+        return blits
+    
+    def cloud_sprites(self, count, alpha=1.0):
+        """Get blits of the first `count` clouds."""
+        shift = self.shift(alpha) if self.depth else 0
+        span = self.CLOUD_RIGHT - self.CLOUD_LEFT
+        blits = []
+        for cloud in self.clouds[:count]:
+            for surface, (x, y) in cloud.sprites(alpha):
+                if shift:
+                    x = int(x - shift - self.CLOUD_LEFT) % span + self.CLOUD_LEFT
+                blits.append((surface, (x, y)))
+        return blits
+
+
+class ParticleAtlas:
+    """Pre-rendered particle circles keyed by (size, color, alpha bucket)."""
+    
+    ALPHA_BUCKETS = 16
+    
+    def __init__(self):
+        self.sprites = {}
+    
+    def get(self, size, color, alpha):
+        """Get the circle sprite closest to the requested alpha."""
+        step = 256 // self.ALPHA_BUCKETS
+        bucket = (alpha + step // 2) // step
+        key = (size, color, bucket)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color + (min(bucket * step, 255),), (size, size), size)
+            sprite = sprite.convert_alpha()
+            self.sprites[key] = sprite
+        return sprite
+
+
+class ParticleSystem:
+    """Fixed-capacity particle pool stored as parallel arrays.
+    
+    Dead particles are retired by moving the last live particle into their
+    slot, so updates never shift the arrays. New particles are dropped while
+    the pool holds `limit` particles.
+    """
+    
+    CAPACITY = 2048
+    LIFE = 30
+    
+    def __init__(self, capacity=CAPACITY, rng=random):
+        self.rng = rng
+        self.capacity = capacity
+        self.limit = capacity  # Lowered by the quality governor
+        self.count = 0
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.velocity_x = [0.0] * capacity
+        self.velocity_y = [0.0] * capacity
+        self.life = [0] * capacity
+        self.size = [0] * capacity
+        self.color = [PARTICLE_COLORS[0]] * capacity
+        self.atlas = ParticleAtlas()
+    
+    def __len__(self):
+        return self.count
+    
+    def spawn(self, x, y, velocity_x, velocity_y, size, color):
+        """Add one particle. Returns False if the pool is full."""
+        i = self.count
+        if i >= self.limit:
+            return False
+        self.x[i] = x
+        self.y[i] = y
+        self.velocity_x[i] = velocity_x
+        self.velocity_y[i] = velocity_y
+        self.life[i] = self.LIFE
+        self.size[i] = size
+        self.color[i] = color
+        self.count = i + 1
+        return True
+    
+    def emit(self, x, y, count=5):
+        """Jump particle effect."""
+        rng = self.rng
+        for _ in range(count):
+            self.spawn(x, y, rng.uniform(-2, 2), rng.uniform(-3, -1),
+                       rng.randint(2, 5), rng.choice(PARTICLE_COLORS))
+    
+    def burst(self, x, y, count, speed=5):
+        """Spray particles outward in every direction."""
+        rng = self.rng
+        for _ in range(count):
+            angle = rng.uniform(0, math.tau)
+            velocity = rng.uniform(1, speed)
+            self.spawn(x, y, math.cos(angle) * velocity, math.sin(angle) * velocity - 1,
+                       rng.randint(2, 5), rng.choice(PARTICLE_COLORS))
     
     def update(self):
-        """Update particle position."""
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.velocity_y += 0.2
-        self.life -= 1
+        """Update particle positions and retire dead ones."""
+        x, y = self.x, self.y
+        velocity_x, velocity_y = self.velocity_x, self.velocity_y
+        life = self.life
+        i = 0
+        count = self.count
+        while i < count:
+            life[i] -= 1
+            if life[i] <= 0:
+                # Swap the last live particle into this slot
+                count -= 1
+                x[i] = x[count]
+                y[i] = y[count]
+                velocity_x[i] = velocity_x[count]
+                velocity_y[i] = velocity_y[count]
+                life[i] = life[count]
+                self.size[i] = self.size[count]
+                self.color[i] = self.color[count]
+                continue
+            x[i] += velocity_x[i]
+            y[i] += velocity_y[i]
+            velocity_y[i] += 0.2
+            i += 1
+        self.count = count
+    
+    def sprites(self):
+        """Get blits of all live particles from the sprite atlas."""
+        get_sprite = self.atlas.get
+        blits = []
+        for i in range(self.count):
+            size = self.size[i]
+            alpha = int((self.life[i] / self.LIFE) * 255)
+            blits.append((get_sprite(size, self.color[i], alpha),
+                          (int(self.x[i] - size), int(self.y[i] - size))))
+        return blits
     
     def draw(self, screen):
-        """Draw particle."""
-        if self.life > 0:
-            alpha = int((self.life / 30) * 255)
-            color = self.color + (alpha,)
-            surface = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(surface, color, (self.size, self.size), self.size)
-            screen.blit(surface, (int(self.x - self.size), int(self.y - self.size)))
+        """Draw all live particles from the sprite atlas."""
+        screen.blits(self.sprites(), False)
     
-    def is_dead(self):
-        """Check if particle is dead."""
-        return self.life <= 0
+    def clear(self):
+        """Remove every particle."""
+        self.count = 0
 
 
 class SoundManager:
-    """Manages all game sounds."""
+    """Manages all game sounds.
+    
+    Each category plays on its own reserved mixer channels, round robin, so
+    a burst of jumps can never take the channel the crash sound needs and
+    is never dropped for lack of a free channel. Default sounds are
+    synthesized once into sample buffers; use() swaps in sounds from files.
+    """
+    
+    CATEGORIES = {"jump": 2, "hit": 1, "point": 1}  # category -> reserved channels
+    VOLUME = 0.4
     
     def __init__(self):
-        self.jump_sound = None
-        self.hit_sound = None
-        self.point_sound = None
+        self.defaults = {}
+        self.sounds = {}
+        self.channels = {}
+        self.next_channel = {}
+        self.trigger_time = 0.0  # seconds spent inside play() calls
+        self.triggers = 0
         
-        # Try to load default sounds (you can replace these paths)
-        self.load_default_sounds()
+        # Opening the audio device here rather than on the first sound keeps
+        # that cost out of the first jump
+        if init_mixer():
+            self.reserve_channels()
+            self.load_default_sounds()
+    
+    def reserve_channels(self):
+        """Set aside mixer channels for every category."""
+        total = sum(self.CATEGORIES.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        index = 0
+        for category, count in self.CATEGORIES.items():
+            self.channels[category] = [pygame.mixer.Channel(index + i) for i in range(count)]
+            self.next_channel[category] = 0
+            index += count
     
     def load_default_sounds(self):
-        """Create simple beep sounds if no files are provided."""
-        try:
-            # You can replace these with actual sound file paths
-            # Example: self.jump_sound = pygame.mixer.Sound('jump.wav')
-            pass
-        except:
-            print("No sound files found. Game will run without sound.")
-    
-    def load_jump_sound(self, filepath):
-        """Load custom jump sound."""
-        try:
-            self.jump_sound = pygame.mixer.Sound(filepath)
-            print(f"✓ Jump sound loaded: {filepath}")
-        except Exception as e:
-            print(f"✗ Failed to load jump sound: {e}")
+        """Synthesize simple beep, hit and point sounds."""
+        noise = random.Random(0)
+        waves = {
+            # Rising chirp
+            "jump": (0.12, lambda t: math.sin(2 * math.pi * (500 + 2000 * t) * t)),
+            # Noise burst over a low thump
+            "hit": (0.3, lambda t: 0.6 * noise.uniform(-1, 1) + 0.4 * math.sin(2 * math.pi * 110 * t)),
+            # Two-note chime
+            "point": (0.2, lambda t: math.sin(2 * math.pi * (880 if t < 0.07 else 1320) * t)),
+        }
+        for category, (duration, wave) in waves.items():
+            sound = self.synthesize(duration, wave)
+            if sound is None:
+                return
+            self.defaults[category] = sound
+            self.sounds.setdefault(category, sound)
     
-    def load_hit_sound(self, filepath):
-        """Load custom hit/crash sound."""
-        try:
-            self.hit_sound = pygame.mixer.Sound(filepath)
-            print(f"✓ Hit sound loaded: {filepath}")
-        except Exception as e:
-            print(f"✗ Failed to load hit sound: {e}")
+    def synthesize(self, duration, wave):
+        """Render wave(t), in -1..1, with a linear fade out into a Sound."""
+        frequency, size, channels = pygame.mixer.get_init()
+        if size != AUDIO_SIZE:
+            return None
+        count = int(duration * frequency)
+        scale = self.VOLUME * 32767
+        samples = array("h")
+        for i in range(count):
+            value = int(wave(i / frequency) * (1 - i / count) * scale)
+            samples.extend([value] * channels)
+        return pygame.mixer.Sound(buffer=samples.tobytes())
+    
+    def use(self, category, sound):
+        """Play sound for a category, or the synthesized default if sound is None."""
+        sound = sound or self.defaults.get(category)
+        if sound is None:
+            self.sounds.pop(category, None)
+        else:
+            self.sounds[category] = sound
+    
+    def play(self, category):
+        """Play a category's sound on its next reserved channel."""
+        sound = self.sounds.get(category)
+        if sound is None:
+            return
+        start = time.perf_counter()
+        channels = self.channels.get(category)
+        if channels:
+            index = self.next_channel[category]
+            self.next_channel[category] = (index + 1) % len(channels)
+            channels[index].play(sound)
+        else:
+            sound.play()
+        self.trigger_time += time.perf_counter() - start
+        self.triggers += 1
+    
+    def latency_ms(self):
+        """Estimate trigger-to-output latency in milliseconds.
+        
+        Worked out from the mixer settings, not measured: the mixer buffer
+        must drain before a new sound is heard, and the mean time spent inside
+        play() is added to it. Buffering in the audio driver and device comes
+        on top, so this is a lower bound. Returns None without audio.
+        """
+        settings = pygame.mixer.get_init()
+        if not settings:
+            return None
+        buffer_ms = AUDIO_BUFFER / settings[0] * 1000
+        trigger_ms = self.trigger_time / self.triggers * 1000 if self.triggers else 0.0
+        return buffer_ms + trigger_ms
     
     def play_jump(self):
         """Play jump sound."""
-        if self.jump_sound:
-            self.jump_sound.play()
+        self.play("jump")
     
     def play_hit(self):
         """Play hit/crash sound."""
-        if self.hit_sound:
-            self.hit_sound.play()
+        self.play("hit")
     
     def play_point(self):
         """Play point scored sound."""
-        if self.point_sound:
-            self.point_sound.play()
+        self.play("point")
 
 
-class Bird:
-    """Player character."""
+class Bird(simulation.Bird):
+    """Player character.
+    
+    Drawing is nothing but blits of shared, pre-rendered surfaces: the image
+    at every rotation the physics can produce, the glow, the default body
+    and the trail dots. The trail is a fixed-size ring buffer of positions.
+    """
+    
+    TRAIL_LIFE = 10  # Updates a trail point stays visible for
+    # update() rotates by velocity * 3 clamped to -30..90 degrees, and the
+    # velocity moves in steps of GRAVITY, so rotations fall on this grid
+    ROTATION_MIN = -30
+    ROTATION_MAX = 90
+    ROTATION_STEP = simulation.GRAVITY * 3
+    MAX_IMAGES = 8
     
-    def __init__(self, sound_manager):
-        self.x = 80
-        self.y = 250
-        self.width = 40
-        self.height = 40
-        self.velocity = 0
-        self.rotation = 0
+    # Shared surfaces
+    rotations = {}  # image -> [(rotated image, half width, half height)] per step
+    trail_dots = {}  # (width, points) -> [(dot or None, radius)] per point
+    glows = {}
+    bodies = {}
+    
+    def __init__(self, settings=simulation.DEFAULT_SETTINGS):
+        super().__init__(settings)
         self.image = None
-        self.sound_manager = sound_manager
-        self.trail = []  # Trail effect
+        self.glow_enabled = True
+        self.prev_y = self.y  # Position before the last update, for interpolation
+        self.trail_x = []
+        self.trail_y = []
+        self.trail_count = 0
+        self.trail_head = 0
+        self.set_trail_length(8)
     
-    def load_image(self, filepath):
-        """Load custom character image."""
-        try:
-            self.image = pygame.image.load(filepath)
-            self.image = pygame.transform.scale(self.image, (self.width, self.height))
-            print(f"✓ Character image loaded: {filepath}")
-        except Exception as e:
-            print(f"✗ Failed to load character image: {e}")
-            self.image = None
-    
-    def jump(self):
-        """Make the character jump."""
-        self.velocity = JUMP_STRENGTH
-        self.sound_manager.play_jump()  # Play jump sound
-        return [(self.x + self.width//2, self.y + self.height//2) for _ in range(5)]  # Return particle positions
+    def set_trail_length(self, length):
+        """Resize the trail ring buffer, keeping the newest points."""
+        if length == len(self.trail_x):
+            return
+        points = self.trail_points()
+        points = points[len(points) - length:] if length else []
+        self.trail_x = [0.0] * length
+        self.trail_y = [0.0] * length
+        self.trail_count = 0
+        self.trail_head = 0
+        for x, y in points:
+            self.add_trail_point(x, y)
+    
+    def trail_points(self):
+        """Get the trail positions, oldest first."""
+        length = len(self.trail_x)
+        start = self.trail_head - self.trail_count
+        return [(self.trail_x[(start + i) % length], self.trail_y[(start + i) % length])
+                for i in range(self.trail_count)]
+    
+    def add_trail_point(self, x, y):
+        """Write a position over the oldest trail point."""
+        length = len(self.trail_x)
+        if not length:
+            return
+        head = self.trail_head
+        self.trail_x[head] = x
+        self.trail_y[head] = y
+        self.trail_head = (head + 1) % length
+        if self.trail_count < length:
+            self.trail_count += 1
     
     def update(self):
-        """Update character physics."""
-        self.velocity += GRAVITY
-        self.y += self.velocity
-        
-        # Update rotation
-        self.rotation = min(max(self.velocity * 3, -30), 90)
+        """Update character physics and trail."""
+        self.prev_y = self.y
+        super().update()
         
         # Add to trail
-        self.trail.append((self.x + self.width//2, self.y + self.height//2, 10))
-        if len(self.trail) > 8:
-            self.trail.pop(0)
-        
-        # Update trail alpha
-        for i in range(len(self.trail)):
-            x, y, alpha = self.trail[i]
-            self.trail[i] = (x, y, alpha - 1)
-        
-        # Ground collision
-        if self.y > WINDOW_HEIGHT - 100 - self.height:
-            self.y = WINDOW_HEIGHT - 100 - self.height
-            self.velocity = 0
+        self.add_trail_point(self.x + self.width//2, self.y + self.height//2)
     
-    def draw(self, screen):
-        """Draw the character with trail."""
+    def rotation_table(self):
+        """Get the image rotated to every step of the rotation range."""
+        table = self.rotations.get(self.image)
+        if table is None:
+            if len(self.rotations) >= self.MAX_IMAGES:
+                self.rotations.clear()
+            steps = round((self.ROTATION_MAX - self.ROTATION_MIN) / self.ROTATION_STEP)
+            table = []
+            for step in range(steps + 1):
+                rotated = pygame.transform.rotate(self.image, -(self.ROTATION_MIN + step * self.ROTATION_STEP))
+                table.append((rotated, rotated.get_width() // 2, rotated.get_height() // 2))
+            self.rotations[self.image] = table
+        return table
+    
+    def trail_dot_table(self, count):
+        """Get the dot and radius for each of `count` trail points, oldest first."""
+        key = (self.width, count)
+        table = self.trail_dots.get(key)
+        if table is None:
+            table = []
+            for i in range(count):
+                # Points fade by one step per update; the newest has faded once
+                trail_alpha = self.TRAIL_LIFE - count + i
+                if trail_alpha <= 0:
+                    table.append((None, 0))
+                    continue
+                size = int(self.width * 0.3 * (i / count))
+                color = PARTICLE_COLORS[i % len(PARTICLE_COLORS)] + (trail_alpha * 25,)
+                dot = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(dot, color, (size, size), size)
+                table.append((dot, size))
+            self.trail_dots[key] = table
+        return table
+    
+    def glow(self, color):
+        """Get a cached glow circle twice the character's size."""
+        key = (self.width, self.height, color)
+        surface = self.glows.get(key)
+        if surface is None:
+            surface = pygame.Surface((self.width * 2, self.height * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (self.width, self.height), self.width)
+            self.glows[key] = surface
+        return surface
+    
+    def body(self):
+        """Get the cached default circle, with a pixel of margin around it."""
+        radius = self.width // 2
+        surface = self.bodies.get(radius)
+        if surface is None:
+            surface = pygame.Surface((radius * 2 + 2, radius * 2 + 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, GOLD, (radius + 1, radius + 1), radius)
+            self.bodies[radius] = surface
+        return surface
+    
+    def sprites(self, alpha=1.0):
+        """Get the character and trail blits, interpolated `alpha` of the way from its last position."""
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        blits = []
+        
         # Draw trail
-        for i, (x, y, alpha) in enumerate(self.trail):
-            if alpha > 0:
-                size = int(self.width * 0.3 * (i / len(self.trail)))
-                color = PARTICLE_COLORS[i % len(PARTICLE_COLORS)] + (alpha * 25,)
-                surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(surface, color, (size, size), size)
-                screen.blit(surface, (int(x - size), int(y - size)))
+        count = self.trail_count
+        if count:
+            trail_x = self.trail_x
+            trail_y = self.trail_y
+            length = len(trail_x)
+            start = self.trail_head - count
+            for i, (dot, size) in enumerate(self.trail_dot_table(count)):
+                if dot is not None:
+                    j = (start + i) % length
+                    blits.append((dot, (int(trail_x[j] - size), int(trail_y[j] - size))))
         
+        center_x = self.x + self.width//2
+        center_y = y + self.height//2
         if self.image:
-            # Rotate and draw image with glow
-            rotated_image = pygame.transform.rotate(self.image, -self.rotation)
-            rect = rotated_image.get_rect(center=(self.x + self.width//2, self.y + self.height//2))
+            # Draw the pre-rotated image with glow, centered like Rect.center
+            table = self.rotation_table()
+            step = round((self.rotation - self.ROTATION_MIN) / self.ROTATION_STEP)
+            rotated_image, half_width, half_height = table[min(max(step, 0), len(table) - 1)]
             
-            # Draw glow effect
-            glow_surface = pygame.Surface((self.width * 2, self.height * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (255, 255, 255, 30), (self.width, self.height), self.width)
-            screen.blit(glow_surface, (int(self.x - self.width//2), int(self.y - self.height//2)))
-            
-            screen.blit(rotated_image, rect)
+            if self.glow_enabled:
+                blits.append((self.glow((255, 255, 255, 30)), (int(self.x - self.width//2), int(y - self.height//2))))
+            blits.append((rotated_image, (math.floor(center_x + 0.5) - half_width,
+                                          math.floor(center_y + 0.5) - half_height)))
         else:
             # Draw default circle with glow
-            glow_surface = pygame.Surface((self.width * 2, self.height * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (255, 215, 0, 50), (self.width, self.height), self.width)
-            screen.blit(glow_surface, (int(self.x - self.width//2), int(self.y - self.height//2)))
+            if self.glow_enabled:
+                blits.append((self.glow((255, 215, 0, 50)), (int(self.x - self.width//2), int(y - self.height//2))))
             
-            pygame.draw.circle(screen, GOLD, 
-                             (int(self.x + self.width//2), int(self.y + self.height//2)), 
-                             self.width//2)
+            radius = self.width//2
+            blits.append((self.body(), (int(center_x) - radius - 1, int(center_y) - radius - 1)))
+        return blits
     
-    def get_rect(self):
-        """Get collision rectangle."""
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+    def draw(self, screen, alpha=1.0):
+        """Draw the character with trail, interpolated `alpha` of the way from its last position."""
+        screen.blits(self.sprites(alpha), False)
 
 
-class Pipe:
-    """Obstacle pipe."""
+class PipeSpriteCache:
+    """LRU cache of pre-rendered top and bottom pipe pieces."""
+    
+    # Pipe heights come from a small discrete range, so this covers all of them
+    MAX_ENTRIES = 256
+    # Caps stick out this far on each side of the pipe body
+    CAP_OVERHANG = 5
     
-    def __init__(self, x, obstacle_image=None):
-        self.x = x
-        self.width = 60
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, width, top_height, bottom_height, obstacle_image=None, flat=False):
+        """Get (top, bottom) surfaces for a pipe, rendering them on a miss.
         
-        # Random height for top pipe
-        self.top_height = random.randint(50, WINDOW_HEIGHT - 200 - PIPE_GAP)
-        self.bottom_y = self.top_height + PIPE_GAP
-        self.bottom_height = WINDOW_HEIGHT - 100 - self.bottom_y
+        flat fills the pipe bodies with one color instead of a gradient.
+        """
+        key = (width, top_height, bottom_height, obstacle_image, flat)
+        sprites = self.entries.get(key)
+        if sprites is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return sprites
         
-        self.passed = False
+        self.misses += 1
+        if obstacle_image:
+            sprites = self.render_image(width, top_height, bottom_height, obstacle_image)
+        else:
+            sprites = self.render_gradient(width, top_height, bottom_height, flat)
+        self.entries[key] = sprites
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return sprites
+    
+    def clear(self):
+        """Drop all cached sprites."""
+        self.entries.clear()
+    
+    def render_image(self, width, top_height, bottom_height, obstacle_image):
+        """Scale the custom obstacle image to both pipe pieces."""
+        top_img = pygame.transform.scale(obstacle_image, (width, top_height))
+        bottom_img = pygame.transform.scale(obstacle_image, (width, bottom_height))
+        
+        # Flip top image
+        top_img = pygame.transform.flip(top_img, False, True)
+        return top_img.convert_alpha(), bottom_img.convert_alpha()
+    
+    def render_gradient(self, width, top_height, bottom_height, flat=False):
+        """Render both gradient pipe pieces including their caps."""
+        pad = self.CAP_OVERHANG
+        draw_body = self.draw_flat_body if flat else self.draw_body
+        
+        # Top pipe
+        top = pygame.Surface((width + pad * 2, top_height), pygame.SRCALPHA)
+        draw_body(top, pad, 0, width, top_height)
+        
+        # Pipe outline and cap
+        pygame.draw.rect(top, PIPE_OUTLINE, (pad, 0, width, top_height), 3)
+        pygame.draw.rect(top, PIPE_OUTLINE, (0, top_height - 20, width + pad * 2, 20))
+        pygame.draw.rect(top, PIPE_COLOR, (0, top_height - 20, width + pad * 2, 20), 3)
+        
+        # Bottom pipe
+        bottom = pygame.Surface((width + pad * 2, bottom_height), pygame.SRCALPHA)
+        draw_body(bottom, pad, 0, width, bottom_height)
+        
+        pygame.draw.rect(bottom, PIPE_OUTLINE, (pad, 0, width, bottom_height), 3)
+        pygame.draw.rect(bottom, PIPE_OUTLINE, (0, 0, width + pad * 2, 20))
+        pygame.draw.rect(bottom, PIPE_COLOR, (0, 0, width + pad * 2, 20), 3)
+        return top.convert_alpha(), bottom.convert_alpha()
+    
+    def draw_body(self, surface, x, y, width, height):
+        """Draw the vertical gradient of a pipe body."""
+        for i in range(height):
+            gradient_factor = i / max(height, 1)
+            color = tuple(int(PIPE_COLOR[j] * (1 - gradient_factor * 0.3)) for j in range(3))
+            pygame.draw.line(surface, color, (x, y + i), (x + width, y + i))
+    
+    def draw_flat_body(self, surface, x, y, width, height):
+        """Fill a pipe body with its base color."""
+        surface.fill(PIPE_COLOR, (x, y, width + 1, height))
+
+
+class Pipe(simulation.Pipe):
+    """Obstacle pipe."""
+    
+    __slots__ = ("obstacle_image", "images", "prev_x", "flat")
+    
+    sprite_cache = PipeSpriteCache()
+    
+    def __init__(self, x, obstacle_image=None, rng=random, settings=simulation.DEFAULT_SETTINGS):
+        super().__init__(x, rng, settings)
         self.obstacle_image = obstacle_image
+        self.images = None  # (top, bottom) surfaces from the sprite cache
+        self.flat = False
+        self.prev_x = x  # Position before the last update, for interpolation
     
     def update(self):
         """Move pipe left."""
-        self.x -= PIPE_SPEED
+        self.prev_x = self.x
+        super().update()
     
-    def draw(self, screen):
-        """Draw pipes with aesthetic design."""
-        if self.obstacle_image:
-            # Draw custom obstacle images with shadow
-            shadow_surface = pygame.Surface((self.width + 10, max(self.top_height, self.bottom_height) + 10), pygame.SRCALPHA)
-            pygame.draw.rect(shadow_surface, (0, 0, 0, 30), (5, 5, self.width, max(self.top_height, self.bottom_height)))
-            
-            top_img = pygame.transform.scale(self.obstacle_image, (self.width, self.top_height))
-            bottom_img = pygame.transform.scale(self.obstacle_image, (self.width, self.bottom_height))
-            
-            # Flip top image
-            top_img = pygame.transform.flip(top_img, False, True)
-            
-            screen.blit(top_img, (self.x, 0))
-            screen.blit(bottom_img, (self.x, self.bottom_y))
+    def sprites(self, alpha=1.0):
+        """Get the pipe blits, interpolated `alpha` of the way from their last position."""
+        if self.images is None:
+            self.images = self.sprite_cache.get(self.width, self.top_height, self.bottom_height,
+                                                self.obstacle_image, self.flat)
+        top_img, bottom_img = self.images
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        
+        if not self.obstacle_image:
+            x -= PipeSpriteCache.CAP_OVERHANG
+        return [(top_img, (x, 0)), (bottom_img, (x, self.bottom_y))]
+    
+    def draw(self, screen, alpha=1.0):
+        """Draw pipes, interpolated `alpha` of the way from their last position."""
+        screen.blits(self.sprites(alpha), False)
+
+
+class CollisionMasks:
+    """Pixel-perfect narrow phase for custom character and obstacle images.
+    
+    Masks are built once per scaled obstacle size and per bird rotation,
+    quantized to ROTATION_STEP degrees, and reused every frame. Sprites
+    without an image collide as their full rectangle.
+    """
+    
+    ROTATION_STEP = 3
+    MAX_ENTRIES = 1024
+    
+    def __init__(self):
+        self.masks = {}
+    
+    def cached(self, key, build):
+        """Get a cached mask, building it with build() on a miss."""
+        mask = self.masks.get(key)
+        if mask is None:
+            if len(self.masks) >= self.MAX_ENTRIES:
+                self.masks.clear()
+            mask = build()
+            self.masks[key] = mask
+        return mask
+    
+    def box_mask(self, width, height):
+        """Get a fully set mask of a rectangle."""
+        return self.cached(("box", width, height), lambda: pygame.Mask((width, height), fill=True))
+    
+    def pipe_mask(self, image, width, height, flipped):
+        """Get the mask of an obstacle image scaled to a pipe piece."""
+        def build():
+            surface = pygame.transform.scale(image, (width, height))
+            return pygame.mask.from_surface(pygame.transform.flip(surface, False, flipped))
+        return self.cached(("pipe", image, width, height, flipped), build)
+    
+    def bird_mask(self, image, rotation):
+        """Get the mask of the character image at a quantized rotation."""
+        step = self.ROTATION_STEP
+        angle = round(rotation / step) * step
+        return self.cached(("bird", image, angle),
+                           lambda: pygame.mask.from_surface(pygame.transform.rotate(image, -angle)))
+    
+    def collide(self, bird, pipes, start=0):
+        """Check if bird collides with pipes from index start on, pixel for pixel, or the ground."""
+        # Check ground collision
+        if bird.y + bird.height >= WINDOW_HEIGHT - GROUND_HEIGHT:
+            return True
+        
+        # Place the bird mask centered on the bird, like Bird.draw
+        if bird.image:
+            bird_mask = self.bird_mask(bird.image, bird.rotation)
+            mask_width, mask_height = bird_mask.get_size()
+            bird_x = int(bird.x + bird.width // 2) - mask_width // 2
+            bird_y = int(bird.y + bird.height // 2) - mask_height // 2
         else:
-            # Draw aesthetic gradient pipes
-            # Top pipe
-            for i in range(self.top_height):
-                gradient_factor = i / max(self.top_height, 1)
-                color = tuple(int(PIPE_COLOR[j] * (1 - gradient_factor * 0.3)) for j in range(3))
-                pygame.draw.line(screen, color, (self.x, i), (self.x + self.width, i))
-            
-            # Pipe outline and cap
-            pygame.draw.rect(screen, PIPE_OUTLINE, (self.x, 0, self.width, self.top_height), 3)
-            pygame.draw.rect(screen, PIPE_OUTLINE, (self.x - 5, self.top_height - 20, self.width + 10, 20))
-            pygame.draw.rect(screen, PIPE_COLOR, (self.x - 5, self.top_height - 20, self.width + 10, 20), 3)
-            
-            # Bottom pipe
-            for i in range(self.bottom_height):
-                gradient_factor = i / max(self.bottom_height, 1)
-                color = tuple(int(PIPE_COLOR[j] * (1 - gradient_factor * 0.3)) for j in range(3))
-                pygame.draw.line(screen, color, (self.x, self.bottom_y + i), (self.x + self.width, self.bottom_y + i))
-            
-            pygame.draw.rect(screen, PIPE_OUTLINE, (self.x, self.bottom_y, self.width, self.bottom_height), 3)
-            pygame.draw.rect(screen, PIPE_OUTLINE, (self.x - 5, self.bottom_y, self.width + 10, 20))
-            pygame.draw.rect(screen, PIPE_COLOR, (self.x - 5, self.bottom_y, self.width + 10, 20), 3)
+            bird_mask = self.box_mask(bird.width, bird.height)
+            bird_x, bird_y = int(bird.x), int(bird.y)
+            mask_width, mask_height = bird.width, bird.height
+        
+        for index in range(start, len(pipes)):
+            pipe = pipes[index]
+            x = int(pipe.x)
+            if x >= bird_x + mask_width:
+                break
+            if x + pipe.width <= bird_x:
+                continue
+            for y, height, flipped in ((0, pipe.top_height, True),
+                                       (pipe.bottom_y, pipe.bottom_height, False)):
+                if not height or bird_y >= y + height or bird_y + mask_height <= y:
+                    continue
+                if pipe.obstacle_image:
+                    pipe_mask = self.pipe_mask(pipe.obstacle_image, pipe.width, height, flipped)
+                else:
+                    pipe_mask = self.box_mask(pipe.width, height)
+                if pipe_mask.overlap(bird_mask, (bird_x - x, bird_y - y)):
+                    return True
+        return False
+
+
+class BackgroundLayers:
+    """Pre-rendered sky, ground and grass layers."""
+    
+    GROUND_HEIGHT = 100
+    GRASS_CYCLE = 30
+    GRASS_COLOR = (100, 150, 50)
+    GROUND_LINE_COLOR = (80, 140, 60)
+    # Grass strip spans from above the blade tips to below the ground line
+    STRIP_ABOVE = 15
+    STRIP_BELOW = 5
+    
+    def __init__(self):
+        self.sky = None
+        self.ground = None
+        self.grass_strips = {}
+        self.key = None
     
-    def is_off_screen(self):
-        """Check if pipe is off screen."""
-        return self.x + self.width < 0
+    def ensure(self, screen):
+        """Rebuild the layers if the screen size or theme colors changed."""
+        key = (screen.get_size(), SKY_TOP, SKY_BOTTOM, GROUND_TOP, GROUND_BOTTOM)
+        if key != self.key:
+            self.build(screen)
+            self.key = key
     
-    def get_rects(self):
-        """Get collision rectangles."""
-        top_rect = pygame.Rect(self.x, 0, self.width, self.top_height)
-        bottom_rect = pygame.Rect(self.x, self.bottom_y, self.width, self.bottom_height)
-        return [top_rect, bottom_rect]
+    def build(self, screen):
+        """Render the static gradients once in the display pixel format."""
+        width, height = screen.get_size()
+        sky_height = height - self.GROUND_HEIGHT
+        
+        sky = pygame.Surface((width, sky_height))
+        for y in range(sky_height):
+            gradient_factor = y / sky_height
+            color = tuple(int(SKY_TOP[i] + (SKY_BOTTOM[i] - SKY_TOP[i]) * gradient_factor) for i in range(3))
+            pygame.draw.line(sky, color, (0, y), (width, y))
+        
+        ground = pygame.Surface((width, self.GROUND_HEIGHT))
+        for y in range(self.GROUND_HEIGHT):
+            gradient_factor = y / self.GROUND_HEIGHT
+            color = tuple(int(GROUND_TOP[i] + (GROUND_BOTTOM[i] - GROUND_TOP[i]) * gradient_factor) for i in range(3))
+            pygame.draw.line(ground, color, (0, y), (width, y))
+        
+        self.sky = sky.convert(screen)
+        self.ground = ground.convert(screen)
+        self.grass_strips = {}
+    
+    def grass_strip(self, screen, phase):
+        """Get the grass blades and ground line for one animation phase."""
+        strip = self.grass_strips.get(phase)
+        if strip is None:
+            width = screen.get_width()
+            top = self.STRIP_ABOVE
+            strip = pygame.Surface((width, self.STRIP_ABOVE + self.STRIP_BELOW), pygame.SRCALPHA)
+            offset = phase - self.GRASS_CYCLE // 2
+            for x in range(0, width, 15):
+                grass_x = x + offset
+                if 0 <= grass_x < width:
+                    pygame.draw.line(strip, self.GRASS_COLOR, (grass_x, top), (grass_x + 2, top - 10), 3)
+            pygame.draw.line(strip, self.GROUND_LINE_COLOR, (0, top), (width, top), 4)
+            strip = strip.convert_alpha(screen)
+            self.grass_strips[phase] = strip
+        return strip
+    
+    def sky_sprites(self, screen):
+        """Get the blit of the cached sky gradient."""
+        self.ensure(screen)
+        return [(self.sky, (0, 0))]
+    
+    def ground_sprites(self, screen, frame_count):
+        """Get the blits of the cached ground gradient with animated grass on top."""
+        self.ensure(screen)
+        ground_y = screen.get_height() - self.GROUND_HEIGHT
+        strip = self.grass_strip(screen, frame_count % self.GRASS_CYCLE)
+        return [(self.ground, (0, ground_y)), (strip, (0, ground_y - self.STRIP_ABOVE))]
+    
+    def draw_sky(self, screen):
+        """Blit the cached sky gradient."""
+        screen.blits(self.sky_sprites(screen), False)
+    
+    def draw_ground(self, screen, frame_count):
+        """Blit the cached ground gradient with animated grass on top."""
+        screen.blits(self.ground_sprites(screen, frame_count), False)
 
 
-def check_collision(bird, pipes):
-    """Check if bird collides with pipes."""
-    bird_rect = bird.get_rect()
+class TextRenderer:
+    """One font face per size plus an LRU cache of rendered text surfaces."""
     
-    for pipe in pipes:
-        for pipe_rect in pipe.get_rects():
-            if bird_rect.colliderect(pipe_rect):
-                return True
+    MAX_ENTRIES = 128
+    SHADOW_OFFSET = 3
+    SHADOW_COLOR = (0, 0, 0, 100)
     
-    # Check ground collision
-    if bird.y + bird.height >= WINDOW_HEIGHT - 100:
-        return True
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.entries = OrderedDict()
+    
+    def font(self, size):
+        """Get the default font face at a size, creating it once."""
+        font = self.fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+    
+    def render(self, text, size, color=WHITE, shadow=True):
+        """Get (surface, text_size) with the shadow already composited in."""
+        key = (text, size, tuple(color), shadow)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+        
+        font = self.font(size)
+        text_surface = font.render(text, True, color).convert_alpha()
+        text_size = text_surface.get_size()
+        
+        # Composite in premultiplied alpha so antialiased edges stay exact
+        offset = self.SHADOW_OFFSET if shadow else 0
+        surface = pygame.Surface((text_size[0] + offset, text_size[1] + offset), pygame.SRCALPHA)
+        if shadow:
+            shadow_surface = font.render(text, True, self.SHADOW_COLOR).convert_alpha()
+            surface.blit(shadow_surface.premul_alpha(), (offset, offset))
+        surface.blit(text_surface.premul_alpha(), (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+        entry = (surface, text_size)
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
     
-    return False
+    def sprite(self, text, size, x, y, color=WHITE, shadow=True):
+        """Get the blit of text centered on (x, y)."""
+        surface, (width, height) = self.render(text, size, color, shadow)
+        return (surface, (x - width // 2, y - height // 2), None, pygame.BLEND_PREMULTIPLIED)
+    
+    def draw(self, screen, text, size, x, y, color=WHITE, shadow=True):
+        """Draw text centered on (x, y)."""
+        screen.blits([self.sprite(text, size, x, y, color, shadow)], False)
+
+
+text_renderer = TextRenderer()
 
 
 def draw_text(screen, text, size, x, y, color=WHITE, shadow=True):
     """Draw text with shadow."""
-    font = pygame.font.Font(None, size)
-    if shadow:
-        shadow_surface = font.render(text, True, (0, 0, 0, 100))
-        shadow_rect = shadow_surface.get_rect(center=(x + 3, y + 3))
-        screen.blit(shadow_surface, shadow_rect)
+    text_renderer.draw(screen, text, size, x, y, color, shadow)
+
+
+class DirtyRenderer:
+    """Repaints only the parts of the screen that changed since the last frame.
     
-    text_surface = font.render(text, True, color)
-    text_rect = text_surface.get_rect(center=(x, y))
-    screen.blit(text_surface, text_rect)
+    Every layer hands over its blits for the frame, back to front. Blits that
+    were not there last frame, and blits that went away, mark their
+    rectangles dirty. Each dirty rectangle is then repainted from the sky up
+    with every blit that touches it, clipped to the rectangle, and only those
+    rectangles are pushed to the display. When too much changed, the frame
+    is redrawn and flipped whole instead.
+    """
+    
+    MAX_RECTS = 256
+    FULL_REDRAW_FRACTION = 0.5
+    PAD = 1  # Float blit positions can land a pixel either way
+    
+    def __init__(self):
+        self.previous = None
+        self.previous_bounds = {}
+        self.size = None
+    
+    def invalidate(self):
+        """Redraw the whole screen next frame."""
+        self.previous = None
+    
+    def bounds(self, blits):
+        """Get the padded screen rectangle each blit covers."""
+        pad = self.PAD
+        Rect = pygame.Rect
+        return [Rect(int(blit[1][0]) - pad, int(blit[1][1]) - pad,
+                     blit[0].get_width() + 2 * pad, blit[0].get_height() + 2 * pad)
+                for blit in blits]
+    
+    def changed_rects(self, previous, layers, bounds):
+        """Get the rectangles of blits that differ between two frames, or None if too many did.
+        
+        bounds maps every blit of this frame to its rectangle.
+        """
+        previous_bounds = self.previous_bounds
+        rects = []
+        for old, new in zip(previous, layers):
+            if old == new:
+                continue
+            old = set(old)
+            new = set(new)
+            rects.extend(previous_bounds[blit] for blit in old - new)
+            rects.extend(bounds[blit] for blit in new - old)
+            if len(rects) > self.MAX_RECTS:
+                return None
+        return rects
+    
+    def merge(self, rects, screen_rect):
+        """Clip rects to the screen and union the ones that overlap."""
+        merged = []
+        for rect in rects:
+            rect = rect.clip(screen_rect)
+            if not rect.width or not rect.height:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect = rect.union(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+    
+    def render(self, screen, layers, full=False):
+        """Draw layers, a list of blit lists in back-to-front order.
+        
+        Returns the rectangles to pass to pygame.display.update(), or None
+        after a full redraw that should be flipped.
+        """
+        blits = [blit for layer in layers for blit in layer]
+        bounds = self.bounds(blits)
+        bounds_by_blit = dict(zip(blits, bounds))
+        previous = self.previous
+        rects = None
+        if not full and previous is not None and len(previous) == len(layers) \
+                and screen.get_size() == self.size:
+            rects = self.changed_rects(previous, layers, bounds_by_blit)
+        self.previous = layers
+        self.previous_bounds = bounds_by_blit
+        if rects is not None:
+            screen_rect = screen.get_rect()
+            rects = self.merge(rects, screen_rect)
+            area = sum(rect.width * rect.height for rect in rects)
+            if area > screen_rect.width * screen_rect.height * self.FULL_REDRAW_FRACTION:
+                rects = None
+        
+        if rects is None:
+            self.size = screen.get_size()
+            screen.blits(blits, False)
+            return None
+        
+        for rect in rects:
+            screen.set_clip(rect)
+            screen.blits([blits[i] for i in rect.collidelistall(bounds)], False)
+        screen.set_clip(None)
+        return rects
 
 
-def main():
-    """Main game function."""
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-    pygame.display.set_caption("Flappy Game with Sound")
-    clock = pygame.time.Clock()
+QualityTier = namedtuple("QualityTier", "name stars clouds trail glow particles gradient_pipes")
+
+# Best first; the governor only ever moves one tier at a time. stars and
+# clouds are the fraction of each ambient layer's objects that are drawn.
+QUALITY_TIERS = [
+    QualityTier("high", stars=1.0, clouds=1.0, trail=8, glow=True, particles=2048, gradient_pipes=True),
+    QualityTier("medium", stars=0.6, clouds=0.8, trail=4, glow=True, particles=512, gradient_pipes=True),
+    QualityTier("low", stars=0.3, clouds=0.4, trail=0, glow=False, particles=128, gradient_pipes=False),
+    QualityTier("minimal", stars=0.0, clouds=0.0, trail=0, glow=False, particles=32, gradient_pipes=False),
+]
+
+
+class QualityGovernor:
+    """Picks a quality tier from recent frame times.
     
-    # Initialize sound manager
-    sound_manager = SoundManager()
+    observe() takes the busy time of every frame, excluding time spent
+    waiting for the frame limiter. At the end of each window of WINDOW
+    frames, a slow frame percentile above DOWN_FRACTION of the budget steps
+    one tier down. Stepping back up takes UP_WINDOWS windows in a row under
+    UP_FRACTION, and the wide gap between the two keeps the tier from
+    oscillating. A locked governor never changes tier.
+    """
     
-    # Print instructions
-    print("\n" + "="*50)
-    print("FLAPPY GAME - Sound Setup Instructions")
-    print("="*50)
-    print("\nTo add custom sounds and images:")
-    print("1. Place files in the same folder as this script")
-    print("2. Name them as follows:")
-    print("   - character.png (character image)")
-    print("   - obstacle.png (obstacle image)")
-    print("   - jump.wav or jump.mp3 (jump sound)")
-    print("   - hit.wav or hit.mp3 (crash sound)")
-    print("\n" + "="*50)
-    print("\nControls:")
-    print("- SPACE or MOUSE CLICK: Jump")
-    print("- R: Restart after game over")
-    print("- ESC: Quit")
-    print("="*50 + "\n")
-    
-    # Try to load custom files
-    bird = Bird(sound_manager)
-    obstacle_image = None
-    
-    # Load character image
-    if os.path.exists('character.png'):
-        bird.load_image('character.png')
-    
-    # Load obstacle image
-    if os.path.exists('obstacle.png'):
-        try:
-            obstacle_image = pygame.image.load('obstacle.png')
-            print("✓ Obstacle image loaded: obstacle.png")
-        except:
-            print("✗ Failed to load obstacle.png")
-    
-    # Load sounds
-    for jump_file in ['jump.wav', 'jump.mp3', 'jump.ogg']:
-        if os.path.exists(jump_file):
-            sound_manager.load_jump_sound(jump_file)
-            break
-    
-    for hit_file in ['hit.wav', 'hit.mp3', 'crash.wav', 'crash.mp3']:
-        if os.path.exists(hit_file):
-            sound_manager.load_hit_sound(hit_file)
-            break
-    
-    # Game variables
-    pipes = []
-    particles = []
-    clouds = [Cloud() for _ in range(5)]
-    stars = [Star() for _ in range(20)]
-    score = 0
-    best_score = 0
-    frame_count = 0
-    game_active = False
-    game_over = False
-    
-    running = True
-    while running:
-        # Event handling
+    WINDOW = 60
+    PERCENTILE = 0.9
+    DOWN_FRACTION = 0.85
+    UP_FRACTION = 0.5
+    UP_WINDOWS = 3
+    
+    def __init__(self, budget, tier=0, locked=False):
+        self.budget = budget
+        self.tier = tier
+        self.locked = locked
+        self.samples = []
+        self.calm_windows = 0
+    
+    def current(self):
+        """Get the QualityTier in use."""
+        return QUALITY_TIERS[self.tier]
+    
+    def observe(self, seconds):
+        """Record one frame's busy time. Returns True if the tier changed."""
+        if self.locked:
+            return False
+        samples = self.samples
+        samples.append(seconds)
+        if len(samples) < self.WINDOW:
+            return False
+        samples.sort()
+        slow = samples[int(len(samples) * self.PERCENTILE)]
+        samples.clear()
+        
+        if slow > self.budget * self.DOWN_FRACTION:
+            self.calm_windows = 0
+            if self.tier < len(QUALITY_TIERS) - 1:
+                self.tier += 1
+                return True
+        elif slow < self.budget * self.UP_FRACTION:
+            self.calm_windows += 1
+            if self.calm_windows >= self.UP_WINDOWS and self.tier > 0:
+                self.calm_windows = 0
+                self.tier -= 1
+                return True
+        else:
+            self.calm_windows = 0
+        return False
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a ring buffer, with a live overlay.
+    
+    The game loop calls begin_frame(), then mark(phase) after each phase and
+    end_frame() at the end. mark() returns at once while the profiler is
+    disabled, so leaving the calls in the loop costs next to nothing.
+    Histograms cover every recorded frame and can be saved as JSON or CSV.
+    """
+    
+    CAPACITY = 600  # Ten seconds at 60 FPS
+    GRAPH_FRAMES = 120
+    # Histogram bucket upper bounds in milliseconds
+    BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2, 4, 8, 16.7, 33.3, 50, 100, float("inf")]
+    # Idle time and the overlay itself are left out of "most expensive"
+    EXCLUDED_PHASES = ("overlay", "wait")
+    
+    def __init__(self, phases, capacity=CAPACITY):
+        self.phases = list(phases)
+        self.capacity = capacity
+        self.enabled = False
+        self.overlay = False
+        self.frames = 0
+        self.index = 0
+        self.history = {phase: [0.0] * capacity for phase in self.phases}
+        self.totals = [0.0] * capacity
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.histograms = {phase: [0] * len(self.BUCKETS_MS) for phase in self.phases + ["frame"]}
+        self.frame_start = 0.0
+        self.last = 0.0
+        self.panel = None
+        self.labels = None
+    
+    def begin_frame(self):
+        """Start timing a frame."""
+        if not self.enabled:
+            return
+        self.frame_start = self.last = time.perf_counter()
+    
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+    
+    def end_frame(self):
+        """Store the finished frame in the ring buffer and histograms."""
+        if not self.enabled:
+            return
+        i = self.index
+        histograms = self.histograms
+        for phase, seconds in self.current.items():
+            ms = seconds * 1000
+            self.history[phase][i] = ms
+            histograms[phase][bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.current[phase] = 0.0
+        total = (self.last - self.frame_start) * 1000
+        self.totals[i] = total
+        histograms["frame"][bisect.bisect_left(self.BUCKETS_MS, total)] += 1
+        self.index = (i + 1) % self.capacity
+        self.frames += 1
+    
+    def toggle_overlay(self):
+        """Show or hide the overlay, recording while it is visible."""
+        self.overlay = not self.overlay
+        if self.overlay and not self.enabled:
+            self.enabled = True
+            self.begin_frame()
+    
+    def recent(self, samples, count):
+        """Get the last count values of a ring buffer, oldest first."""
+        count = min(count, self.frames, self.capacity)
+        start = (self.index - count) % self.capacity
+        if start + count <= self.capacity:
+            return samples[start:start + count]
+        return samples[start:] + samples[:self.index]
+    
+    def slowest_phase(self, count):
+        """Get (phase, mean ms) of the most expensive phase over recent frames."""
+        best = (None, 0.0)
+        for phase in self.phases:
+            if phase in self.EXCLUDED_PHASES:
+                continue
+            samples = self.recent(self.history[phase], count)
+            mean = sum(samples) / len(samples) if samples else 0.0
+            if mean > best[1]:
+                best = (phase, mean)
+        return best
+    
+    def draw(self, screen):
+        """Draw FPS, a frame-time graph and the most expensive phase."""
+        if not self.overlay or not self.frames:
+            return
+        width, height = self.GRAPH_FRAMES * 2, 110
+        if self.panel is None:
+            self.panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            self.panel.fill((0, 0, 0, 160))
+        screen.blit(self.panel, (5, 5))
+        
+        totals = self.recent(self.totals, self.GRAPH_FRAMES)
+        mean = sum(totals) / len(totals)
+        fps = 1000 / mean if mean else 0
+        phase, phase_ms = self.slowest_phase(self.GRAPH_FRAMES)
+        
+        # Update the text a few times per second so the text cache stays warm
+        if self.frames % 15 == 0 or self.labels is None:
+            self.labels = (f"{fps:.0f} FPS  {mean:.2f} ms", f"slowest: {phase} {phase_ms:.2f} ms")
+        draw_text(screen, self.labels[0], 22, 5 + width // 2, 16, shadow=False)
+        draw_text(screen, self.labels[1], 22, 5 + width // 2, 34, shadow=False)
+        
+        # Frame-time bars, scaled so the 60 FPS budget sits halfway up
+        base = 5 + height - 4
+        scale = 35 / (1000 / FPS)
+        budget_y = base - int(1000 / FPS * scale)
+        pygame.draw.line(screen, GOLD, (5, budget_y), (5 + width, budget_y))
+        for i, ms in enumerate(totals):
+            bar = min(int(ms * scale), 60)
+            color = RED if ms > 1000 / FPS else WHITE
+            pygame.draw.line(screen, color, (5 + i * 2, base), (5 + i * 2, base - bar))
+    
+    def save(self, path):
+        """Write the histograms to a .json or .csv file."""
+        bounds = [str(b) if b != float("inf") else "inf" for b in self.BUCKETS_MS]
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "upper_ms", "count"])
+                for phase, counts in self.histograms.items():
+                    for bound, count in zip(bounds, counts):
+                        writer.writerow([phase, bound, count])
+        else:
+            recorded = min(self.frames, self.capacity)
+            data = {
+                "frames": self.frames,
+                "bucket_upper_ms": bounds,
+                "histograms": self.histograms,
+                "recent_mean_ms": {
+                    phase: sum(self.recent(self.history[phase], recorded)) / recorded if recorded else 0.0
+                    for phase in self.phases
+                },
+            }
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+
+
+class FramePacer:
+    """Frame pacing for the game loops, optionally tuned for input latency.
+    
+    begin() is called before input is polled and end() after the flip.
+    Frames are due at a steady 1 / fps apart. By default end() sleeps until
+    the next frame is due, like clock.tick(). In low latency mode the sleep
+    moves in front of the input poll instead: begin() waits until the latest
+    moment the frame's estimated work still finishes on time, and starts the
+    frame at once if a jump arrives first, so a tap is handled within about a
+    millisecond rather than after the rest of a sleep. Either way events are
+    taken off the queue while waiting and each is stamped with the time it
+    was seen; take_events() hands them to the game with those stamps for the
+    latency measurement.
+    """
+    
+    POLL = 0.001  # Seconds between looks at the event queue while waiting
+    MARGIN = 0.002  # Headroom over the estimated work per frame
+    SMOOTHING = 0.1  # Weight of the newest frame in the work estimate
+    
+    def __init__(self, fps, low_latency=False):
+        self.period = 1.0 / fps if fps else 0.0
+        self.low_latency = low_latency
+        self.due = None  # When the next frame should start, or be flipped in low latency mode
+        self.work = 0.0
+        self.started = 0.0
+        self.events = []  # (event, time it was taken off the queue) not yet handled
+        self.jump_waiting = False
+    
+    def collect(self):
+        """Take waiting events off the queue, stamped with the time now."""
+        now = time.perf_counter()
         for event in pygame.event.get():
+            self.events.append((event, now))
+            if is_jump(event):
+                self.jump_waiting = True
+    
+    def take_events(self):
+        """Get every unhandled event with its arrival time, in queue order."""
+        self.collect()
+        events = self.events
+        self.events = []
+        self.jump_waiting = False
+        return events
+    
+    def wait_until(self, deadline, wake_on_jump=False):
+        """Sleep until deadline while taking input off the queue."""
+        while True:
+            self.collect()
+            if wake_on_jump and self.jump_waiting:
+                return
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, self.POLL))
+    
+    def begin(self):
+        """Wait for the frame's start in low latency mode, then start it."""
+        if self.low_latency and self.due is not None:
+            self.wait_until(self.due - self.work - self.MARGIN, wake_on_jump=True)
+        self.started = time.perf_counter()
+    
+    def end(self):
+        """Schedule the next frame, sleeping until it is due by default."""
+        now = time.perf_counter()
+        self.work += (now - self.started - self.work) * self.SMOOTHING
+        if self.due is None or now > self.due + self.period:
+            # Fell a whole frame behind; start a fresh schedule instead of rushing
+            self.due = now
+        self.due += self.period
+        if not self.low_latency:
+            self.wait_until(self.due)
+
+
+class LatencyMeter:
+    """Input-to-display latency of jumps.
+    
+    Each accepted jump is timestamped with input(), becomes visible once the
+    next simulation step has moved the bird (stepped()), and is measured at the
+    flip that first shows that step (flipped()).
+    """
+    
+    PERCENTILES = [0.5, 0.9, 0.99]
+    
+    def __init__(self):
+        self.pending = []  # Jumps waiting for a step
+        self.stepped_inputs = []  # Jumps waiting for a flip
+        self.samples = []
+    
+    def input(self, when):
+        """Record a jump that arrived at perf_counter() time `when`."""
+        self.pending.append(when)
+    
+    def stepped(self):
+        """The simulation moved the bird for every pending jump."""
+        if self.pending:
+            self.stepped_inputs.extend(self.pending)
+            self.pending.clear()
+    
+    def flipped(self, when):
+        """A frame showing every stepped jump reached the display."""
+        if self.stepped_inputs:
+            self.samples.extend(when - arrived for arrived in self.stepped_inputs)
+            self.stepped_inputs.clear()
+    
+    def summary(self):
+        """Describe the latency distribution in milliseconds."""
+        if not self.samples:
+            return "no jumps measured"
+        samples = sorted(self.samples)
+        count = len(samples)
+        parts = [f"p{round(p * 100)} {samples[int(p * (count - 1))] * 1000:.1f} ms" for p in self.PERCENTILES]
+        return (f"{count} jumps, mean {sum(samples) / count * 1000:.1f} ms, " + ", ".join(parts)
+                + f", max {samples[-1] * 1000:.1f} ms")
+
+
+class FrameCapture:
+    """Records presented frames on a background thread.
+    
+    capture() only blits the screen into the next free surface of a ring
+    allocated up front; a writer thread saves filled surfaces as numbered PNGs
+    in a directory, or appends them to a raw RGB24 stream for an external
+    encoder when the path is "-" (stdout) or ends in .rgb or .raw. When every
+    surface is still waiting to be written, the "drop" policy skips the frame
+    and counts it, while "block" waits for the writer and slows the game down.
+    PNGs are named by presented frame number, so drops show up as gaps.
+    """
+    
+    BUFFERS = 8
+    POLICIES = ("drop", "block")
+    RAW_EXTENSIONS = (".rgb", ".raw")
+    
+    def __init__(self, path, screen, buffers=BUFFERS, policy="drop"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"unknown capture policy {policy!r}")
+        self.path = path
+        self.size = screen.get_size()
+        self.block = policy == "block"
+        self.frames = 0
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+        
+        self.to_stdout = path == "-"
+        if self.to_stdout:
+            self.stream = sys.stdout.buffer
+        elif path.lower().endswith(self.RAW_EXTENSIONS):
+            self.stream = open(path, "wb")
+        else:
+            self.stream = None
+            os.makedirs(path, exist_ok=True)
+        
+        # Same pixel format as the screen, so filling a buffer is a plain copy
+        self.buffers = [pygame.Surface(self.size, 0, screen) for _ in range(buffers)]
+        self.free = queue.Queue()
+        for index in range(buffers):
+            self.free.put(index)
+        self.filled = queue.Queue()
+        self.writer = threading.Thread(target=self.write_frames, name="frame-capture", daemon=True)
+        self.writer.start()
+    
+    def encoder_hint(self):
+        """Get an ffmpeg command line that reads the raw stream."""
+        width, height = self.size
+        return f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {FPS} -i {self.path} capture.mp4"
+    
+    def capture(self, screen):
+        """Queue a copy of the presented frame for the writer."""
+        self.frames += 1
+        try:
+            index = self.free.get(self.block)
+        except queue.Empty:
+            self.dropped += 1
+            return
+        self.buffers[index].blit(screen, (0, 0))
+        self.filled.put((index, self.frames))
+    
+    def write_frames(self):
+        """Writer thread: save filled buffers and hand them back."""
+        while True:
+            item = self.filled.get()
+            if item is None:
+                break
+            index, number = item
+            surface = self.buffers[index]
+            if self.error is None:
+                try:
+                    if self.stream:
+                        self.stream.write(pygame.image.tobytes(surface, "RGB"))
+                    else:
+                        pygame.image.save(surface, os.path.join(self.path, f"frame_{number:06d}.png"))
+                    self.written += 1
+                except (OSError, pygame.error) as e:
+                    # Keep recycling buffers so a blocking capture never hangs
+                    self.error = e
+            self.free.put(index)
+    
+    def close(self):
+        """Write out the queued frames and stop the writer."""
+        self.filled.put(None)
+        self.writer.join()
+        if self.stream:
+            try:
+                if self.to_stdout:
+                    self.stream.flush()
+                else:
+                    self.stream.close()
+            except OSError as e:
+                self.error = self.error or e
+
+
+class Game:
+    """Input handling, effects and rendering on top of a Simulation."""
+    
+    UPDATE_PHASES = ["events", "autopilot", "simulation", "particle_update", "ambient_update"]
+    PRESENT_PHASES = ["overlay", "flip", "capture", "wait"]
+    
+    # Custom files looked up in the working directory, first match wins
+    CHARACTER_FILES = ["character.png"]
+    OBSTACLE_FILES = ["obstacle.png"]
+    JUMP_SOUND_FILES = ["jump.wav", "jump.mp3", "jump.ogg"]
+    HIT_SOUND_FILES = ["hit.wav", "hit.mp3", "crash.wav", "crash.mp3"]
+    POINT_SOUND_FILES = ["point.wav", "point.mp3", "point.ogg"]
+    
+    # (depth, stars, clouds) for every ambient layer, back to front
+    AMBIENT_LAYERS = [(0.0, 20, 5)]
+    
+    # Ticks the autopilot leaves the game over screen up before restarting
+    AUTOPILOT_RESTART_TICKS = FPS * 2
+    
+    def __init__(self, screen, sound_manager, seed=None, record_dir=None, dirty_rects=False,
+                 quality=None, ambient_layers=AMBIENT_LAYERS, autopilot=False, capture=None):
+        self.screen = screen
+        self.sound_manager = sound_manager
+        
+        # Custom assets load in the background while the title screen shows
+        # and are picked up by refresh_assets() once they are ready
+        self.character_path = assets.find(self.CHARACTER_FILES)
+        self.obstacle_path = assets.find(self.OBSTACLE_FILES)
+        self.jump_sound_path = assets.find(self.JUMP_SOUND_FILES)
+        self.hit_sound_path = assets.find(self.HIT_SOUND_FILES)
+        self.point_sound_path = assets.find(self.POINT_SOUND_FILES)
+        assets.preload([self.character_path, self.obstacle_path,
+                        self.jump_sound_path, self.hit_sound_path, self.point_sound_path])
+        self.assets_version = None
+        self.character_image = None
+        self.obstacle_image = None
+        
+        # One seed drives the whole run: pipes come from the simulation's
+        # generator, cosmetic effects from a second stream derived from it
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(f"effects-{seed}")
+        # quality names a tier to lock to; None lets the governor choose
+        if quality is None:
+            self.governor = QualityGovernor(1.0 / FPS)
+        else:
+            tier = [tier.name for tier in QUALITY_TIERS].index(quality)
+            self.governor = QualityGovernor(1.0 / FPS, tier, locked=True)
+        
+        self.collision_masks = CollisionMasks()
+        self.sim = simulation.Simulation(seed, bird_factory=self.make_bird, pipe_factory=self.make_pipe,
+                                         collision=self.collide)
+        
+        self.particles = ParticleSystem(rng=self.rng)
+        self.ambient = [AmbientLayer(stars, clouds, depth, self.rng)
+                        for depth, stars, clouds in ambient_layers]
+        self.background = BackgroundLayers()
+        self.best_score = 0
+        self.running = True
+        self.dropped_ticks = 0
+        self.record_dir = record_dir
+        
+        # The autopilot is a third input source next to the keyboard and mouse
+        self.autopilot = Autopilot()
+        self.autopilot_enabled = autopilot
+        self.autopilot_wait = 0
+        self.capture = capture  # FrameCapture fed every presented frame, if recording
+        self.pacer = None  # FramePacer used instead of clock.tick(), if set
+        self.latency = None  # LatencyMeter for jumps, if measuring
+        
+        # Back-to-front layers, each returning its blits for the frame;
+        # also used by bench.py to time each stage
+        self.layers = [
+            ("sky", self.sky_sprites),
+            ("stars", self.star_sprites),
+            ("clouds", self.cloud_sprites),
+            ("ground", self.ground_sprites),
+            ("pipes", self.pipe_sprites),
+            ("particles", self.particle_sprites),
+            ("bird", self.bird_sprites),
+            ("text", self.hud_sprites),
+        ]
+        self.renderer = DirtyRenderer() if dirty_rects else None
+        self.apply_quality()
+        present_phases = (["repaint"] if dirty_rects else []) + self.PRESENT_PHASES
+        self.profiler = FrameProfiler(self.UPDATE_PHASES + [name for name, _ in self.layers]
+                                      + present_phases)
+    
+    def refresh_assets(self):
+        """Pick up custom assets that finished loading or were reloaded."""
+        assets.poll()
+        if assets.version == self.assets_version:
+            return
+        self.assets_version = assets.version
+        bird = self.sim.state.bird
+        self.character_image = assets.image(self.character_path, (bird.width, bird.height), wait=False)
+        self.obstacle_image = assets.image(self.obstacle_path, wait=False)
+        bird.image = self.character_image
+        self.sound_manager.use("jump", assets.sound(self.jump_sound_path, wait=False))
+        self.sound_manager.use("hit", assets.sound(self.hit_sound_path, wait=False))
+        self.sound_manager.use("point", assets.sound(self.point_sound_path, wait=False))
+    
+    def make_bird(self, settings=simulation.DEFAULT_SETTINGS):
+        """Create the character, with the custom image if there is one."""
+        bird = Bird(settings)
+        bird.image = self.character_image
+        self.apply_bird_quality(bird)
+        return bird
+    
+    def make_pipe(self, x, rng, settings=simulation.DEFAULT_SETTINGS):
+        """Create a pipe drawn with the custom obstacle image if there is one."""
+        pipe = Pipe(x, self.obstacle_image, rng, settings)
+        pipe.flat = not self.governor.current().gradient_pipes
+        return pipe
+    
+    def apply_bird_quality(self, bird):
+        """Set the bird's trail and glow from the quality tier."""
+        tier = self.governor.current()
+        bird.set_trail_length(tier.trail)
+        bird.glow_enabled = tier.glow
+    
+    def apply_quality(self):
+        """Switch every effect to the current quality tier."""
+        tier = self.governor.current()
+        self.particles.limit = min(tier.particles, self.particles.capacity)
+        self.apply_bird_quality(self.sim.state.bird)
+        for pipe in self.sim.state.pipes:
+            if pipe.flat == tier.gradient_pipes:
+                pipe.flat = not tier.gradient_pipes
+                pipe.images = None
+    
+    def frame_done(self, busy):
+        """Feed one frame's busy time to the quality governor."""
+        if self.governor.observe(busy):
+            self.apply_quality()
+            print(f"Quality: {self.governor.current().name}")
+    
+    def uses_pixel_collisions(self):
+        """Check if custom images make collisions pixel-perfect."""
+        return bool(self.character_image or self.obstacle_image)
+    
+    def collide(self, bird, pipes, start=0):
+        """Box broad phase, then pixel-perfect masks when custom images are in use.
+        
+        Masks only ever remove hits, so nothing outside the boxes collides.
+        """
+        if not simulation.check_collision(bird, pipes, start):
+            return False
+        if not (bird.image or self.obstacle_image):
+            return True
+        return self.collision_masks.collide(bird, pipes, start)
+    
+    def restart(self):
+        """Start the next game with the next seed in the run."""
+        self.sim.reset(self.sim.seed + 1)
+        self.particles.clear()
+    
+    def save_replay(self):
+        """Write the finished game to the replay directory."""
+        if self.uses_pixel_collisions():
+            # The headless verifier only knows the rectangle rules
+            print("✗ Replay not saved: custom images make collisions pixel-perfect")
+            return
+        sim = self.sim
+        path = os.path.join(self.record_dir, f"{int(time.time())}-{sim.seed}{replay.EXTENSION}")
+        try:
+            os.makedirs(self.record_dir, exist_ok=True)
+            replay.save(path, replay.from_state(sim.seed, sim.state))
+            print(f"✓ Replay saved: {path}")
+        except (OSError, struct.error) as e:
+            # struct.error: a run of restarts carried the seed past what a replay can store
+            print(f"✗ Failed to save replay: {e}")
+    
+    def handle_events(self):
+        """Process pending input events."""
+        self.refresh_assets()
+        sim = self.sim
+        # init_display() keeps the queue down to INPUT_EVENTS
+        if self.pacer:
+            events = self.pacer.take_events()
+        else:
+            now = time.perf_counter()
+            events = [(event, now) for event in pygame.event.get()]
+        for event, arrived in events:
             if event.type == pygame.QUIT:
-                running = False
+                self.running = False
+            
+            elif is_jump(event):
+                if sim.flap() and self.latency:
+                    self.latency.input(arrived)
+            
+            elif event.type in REPAINT_EVENTS:
+                # Dirty rectangles only cover what changed since the last frame
+                if self.renderer:
+                    self.renderer.invalidate()
             
-            if event.type == pygame.KEYDOWN:
+            elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    running = False
+                    self.running = False
                 
-                if event.key == pygame.K_SPACE:
-                    if not game_active and not game_over:
-                        game_active = True
-                    if game_active and not game_over:
-                        particle_positions = bird.jump()
-                        # Create jump particles
-                        for pos in particle_positions:
-                            particles.append(Particle(pos[0], pos[1]))
-                    
-                if event.key == pygame.K_r and game_over:
+                if event.key == pygame.K_r and sim.state.game_over:
                     # Restart
-                    bird = Bird(sound_manager)
-                    if os.path.exists('character.png'):
-                        bird.load_image('character.png')
-                    pipes = []
-                    particles = []
-                    score = 0
-                    frame_count = 0
-                    game_active = False
-                    game_over = False
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if not game_active and not game_over:
-                    game_active = True
-                if game_active and not game_over:
-                    particle_positions = bird.jump()
-                    # Create jump particles
-                    for pos in particle_positions:
-                        particles.append(Particle(pos[0], pos[1]))
-        
-        # Update game
-        if game_active and not game_over:
-            frame_count += 1
-            
-            # Update bird
-            bird.update()
-            
-            # Update particles
-            for particle in particles[:]:
-                particle.update()
-                if particle.is_dead():
-                    particles.remove(particle)
-            
-            # Spawn pipes
-            if frame_count % PIPE_FREQUENCY == 0:
-                pipes.append(Pipe(WINDOW_WIDTH, obstacle_image))
-            
-            # Update pipes
-            for pipe in pipes[:]:
-                pipe.update()
+                    self.restart()
                 
-                # Check if passed
-                if not pipe.passed and pipe.x + pipe.width < bird.x:
-                    pipe.passed = True
-                    score += 1
-                    sound_manager.play_point()
+                if event.key == pygame.K_a:
+                    self.autopilot_enabled = not self.autopilot_enabled
+                    self.autopilot_wait = 0
                 
-                # Remove off-screen pipes
-                if pipe.is_off_screen():
-                    pipes.remove(pipe)
-            
-            # Check collision
-            if check_collision(bird, pipes):
-                game_over = True
-                sound_manager.play_hit()  # Play hit sound
-                if score > best_score:
-                    best_score = score
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                    if self.renderer:
+                        self.renderer.invalidate()
         
-        # Update background elements
-        for cloud in clouds:
-            cloud.update()
-        for star in stars:
-            star.update()
-        
-        # Draw everything - Gradient sky background
-        for y in range(WINDOW_HEIGHT - 100):
-            gradient_factor = y / (WINDOW_HEIGHT - 100)
-            color = tuple(int(SKY_TOP[i] + (SKY_BOTTOM[i] - SKY_TOP[i]) * gradient_factor) for i in range(3))
-            pygame.draw.line(screen, color, (0, y), (WINDOW_WIDTH, y))
-        
-        # Draw stars
-        for star in stars:
-            star.draw(screen)
-        
-        # Draw clouds
-        for cloud in clouds:
-            cloud.draw(screen)
-        
-        # Draw ground with gradient
-        for y in range(100):
-            gradient_factor = y / 100
-            color = tuple(int(GROUND_TOP[i] + (GROUND_BOTTOM[i] - GROUND_TOP[i]) * gradient_factor) for i in range(3))
-            pygame.draw.line(screen, color, (0, WINDOW_HEIGHT - 100 + y), (WINDOW_WIDTH, WINDOW_HEIGHT - 100 + y))
+        self.handle_jumps()
+    
+    def handle_jumps(self):
+        """Play the sound and particles for jumps since the last call."""
+        sim = self.sim
+        for sim_event in sim.pop_events():
+            if sim_event == EVENT_JUMP:
+                self.sound_manager.play_jump()
+                # Create jump particles
+                x, y = sim.state.bird.center()
+                self.particles.emit(x, y)
+    
+    def fly_autopilot(self):
+        """Let the autopilot start games, jump, and restart after a crash."""
+        sim = self.sim
+        state = sim.state
+        if state.game_over:
+            self.autopilot_wait += 1
+            if self.autopilot_wait >= self.AUTOPILOT_RESTART_TICKS:
+                self.autopilot_wait = 0
+                self.restart()
+        elif not state.game_active or self.autopilot.decide(sim):
+            sim.flap()
+            self.handle_jumps()
+    
+    def update(self):
+        """Advance the game and every effect by one tick."""
+        sim = self.sim
+        profiler = self.profiler
+        if self.autopilot_enabled:
+            self.fly_autopilot()
+        profiler.mark("autopilot")
+        state = sim.state
+        if state.game_active and not state.game_over:
+            sim.step()
+            if self.latency:
+                self.latency.stepped()
+            for sim_event in sim.pop_events():
+                x, y = state.bird.center()
+                if sim_event == EVENT_POINT:
+                    self.sound_manager.play_point()
+                    self.particles.burst(x, y, 15, speed=3)
+                elif sim_event == EVENT_HIT:
+                    self.sound_manager.play_hit()  # Play hit sound
+                    self.particles.burst(x, y, 60)
+                    if state.score > self.best_score:
+                        self.best_score = state.score
+                    if self.record_dir:
+                        self.save_replay()
+        profiler.mark("simulation")
         
-        # Ground decoration - grass blades
-        for x in range(0, WINDOW_WIDTH, 15):
-            offset = (frame_count % 30) - 15
-            grass_x = x + offset
-            if 0 <= grass_x < WINDOW_WIDTH:
-                pygame.draw.line(screen, (100, 150, 50), (grass_x, WINDOW_HEIGHT - 100), 
-                               (grass_x + 2, WINDOW_HEIGHT - 110), 3)
+        # Update particles
+        self.particles.update()
+        profiler.mark("particle_update")
         
-        pygame.draw.line(screen, (80, 140, 60), (0, WINDOW_HEIGHT - 100), (WINDOW_WIDTH, WINDOW_HEIGHT - 100), 4)
+        # Update background elements
+        scrolling = state.game_active and not state.game_over
+        for layer in self.ambient:
+            layer.update(scrolling)
+        profiler.mark("ambient_update")
+    
+    def draw(self, alpha=1.0):
+        """Draw the current frame, interpolating moving objects by `alpha`.
         
-        # Draw pipes
-        for pipe in pipes:
-            pipe.draw(screen)
+        Returns the rectangles that changed in dirty-rectangle mode, or None
+        when the whole frame was drawn.
+        """
+        profiler = self.profiler
+        screen = self.screen
+        renderer = self.renderer
+        layers = []
+        for name, layer in self.layers:
+            blits = layer(alpha)
+            if renderer:
+                layers.append(blits)
+            else:
+                screen.blits(blits, False)
+            profiler.mark(name)
+        rects = None
+        if renderer:
+            rects = renderer.render(screen, layers, full=profiler.overlay)
+            profiler.mark("repaint")
+        profiler.draw(screen)
+        profiler.mark("overlay")
+        return rects
+    
+    def present(self, rects):
+        """Push the frame to the display, only the changed rectangles if given."""
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        if self.latency:
+            self.latency.flipped(time.perf_counter())
+    
+    def capture_frame(self):
+        """Hand the presented frame to the capture, if recording.
         
-        # Draw bird
-        bird.draw(screen)
+        Called after frame_done() so a blocking capture waiting on its writer
+        does not make the quality governor drop effects from the recording.
+        """
+        if self.capture:
+            self.capture.capture(self.screen)
+        self.profiler.mark("capture")
+    
+    def sky_sprites(self, alpha):
+        """Gradient sky background."""
+        return self.background.sky_sprites(self.screen)
+    
+    def star_sprites(self, alpha):
+        """Stars."""
+        fraction = self.governor.current().stars
+        return [blit for layer in self.ambient
+                for blit in layer.star_sprites(round(len(layer.stars) * fraction), alpha)]
+    
+    def cloud_sprites(self, alpha):
+        """Clouds."""
+        fraction = self.governor.current().clouds
+        return [blit for layer in self.ambient
+                for blit in layer.cloud_sprites(round(len(layer.clouds) * fraction), alpha)]
+    
+    def ground_sprites(self, alpha):
+        """Ground with gradient and grass blades."""
+        return self.background.ground_sprites(self.screen, self.sim.state.frame_count)
+    
+    def pipe_sprites(self, alpha):
+        """Pipes."""
+        return [blit for pipe in self.sim.state.pipes for blit in pipe.sprites(alpha)]
+    
+    def particle_sprites(self, alpha):
+        """Particles."""
+        return self.particles.sprites()
+    
+    def bird_sprites(self, alpha):
+        """Bird."""
+        return self.sim.state.bird.sprites(alpha)
+    
+    def hud_sprites(self, alpha):
+        """The score and the start or game over messages."""
+        state = self.sim.state
+        text = text_renderer.sprite
         
         # Draw score
-        draw_text(screen, str(score), 64, WINDOW_WIDTH // 2, 50)
+        blits = [text(str(state.score), 64, WINDOW_WIDTH // 2, 50)]
+        if self.autopilot_enabled:
+            blits.append(text("AUTOPILOT", 20, WINDOW_WIDTH // 2, 90))
         
         # Draw start message
-        if not game_active and not game_over:
-            draw_text(screen, "Flappy Game with Sound", 48, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 60)
-            draw_text(screen, "Press SPACE or CLICK to start", 28, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
-            draw_text(screen, f"Best Score: {best_score}", 32, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40)
+        if not state.game_active and not state.game_over:
+            blits.append(text("Flappy Game with Sound", 48, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 60))
+            blits.append(text("Press SPACE or CLICK to start", 28, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+            blits.append(text(f"Best Score: {self.best_score}", 32, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40))
         
         # Draw game over
-        if game_over:
-            draw_text(screen, "GAME OVER!", 64, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 60, RED)
-            draw_text(screen, f"Score: {score}", 40, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
-            draw_text(screen, f"Best: {best_score}", 36, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40)
-            draw_text(screen, "Press R to restart", 28, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 80)
+        if state.game_over:
+            blits.append(text("GAME OVER!", 64, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 60, RED))
+            blits.append(text(f"Score: {state.score}", 40, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+            blits.append(text(f"Best: {self.best_score}", 36, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40))
+            blits.append(text("Press R to restart", 28, WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 80))
+        return blits
+    
+    def run(self, clock):
+        """Classic loop: one update per rendered frame, locked to FPS."""
+        profiler = self.profiler
+        pacer = self.pacer
+        while self.running:
+            profiler.begin_frame()
+            if pacer:
+                pacer.begin()
+                profiler.mark("wait")
+            start = time.perf_counter()
+            self.handle_events()
+            profiler.mark("events")
+            self.update()
+            self.present(self.draw())
+            profiler.mark("flip")
+            self.frame_done(time.perf_counter() - start)
+            self.capture_frame()
+            if pacer:
+                pacer.end()
+            else:
+                clock.tick(FPS)
+            profiler.mark("wait")
+            profiler.end_frame()
+    
+    def run_fixed(self, clock, tick_rate=FPS, max_steps=5, render_fps=0):
+        """Fixed-timestep loop: updates at tick_rate, renders as often as allowed.
         
-        pygame.display.flip()
-        clock.tick(FPS)
+        Rendering interpolates between the last two ticks. At most max_steps
+        ticks run per rendered frame; any backlog beyond that is dropped and
+        counted in self.dropped_ticks so the game slows down instead of
+        spiralling. render_fps of 0 leaves the frame rate uncapped. A pacer
+        set on the game should be built for render_fps.
+        """
+        profiler = self.profiler
+        pacer = self.pacer
+        tick = 1.0 / tick_rate
+        accumulator = 0.0
+        previous = time.perf_counter()
+        while self.running:
+            profiler.begin_frame()
+            if pacer:
+                pacer.begin()
+                profiler.mark("wait")
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+            
+            self.handle_events()
+            profiler.mark("events")
+            
+            steps = 0
+            while accumulator >= tick and steps < max_steps:
+                self.update()
+                accumulator -= tick
+                steps += 1
+            if accumulator >= tick:
+                self.dropped_ticks += int(accumulator / tick)
+                accumulator %= tick
+            
+            self.present(self.draw(accumulator / tick))
+            profiler.mark("flip")
+            self.frame_done(time.perf_counter() - now)
+            self.capture_frame()
+            if pacer:
+                pacer.end()
+            else:
+                clock.tick(render_fps)
+            profiler.mark("wait")
+            profiler.end_frame()
+
+
+def seed_arg(text):
+    """argparse type for --seed: an int that fits in a replay file."""
+    seed = int(text)
+    if not replay.MIN_SEED <= seed <= replay.MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be between {replay.MIN_SEED} and {replay.MAX_SEED}")
+    return seed
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(
+        description="Flappy Game with Sound",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="To add custom sounds and images, place files in the working folder\n"
+               "named as follows:\n"
+               "  character.png           character image\n"
+               "  obstacle.png            obstacle image\n"
+               "  jump.wav or jump.mp3    jump sound\n"
+               "  hit.wav or hit.mp3      crash sound\n"
+               "  point.wav or point.mp3  point scored sound\n"
+               "\n"
+               "Controls: SPACE or mouse click to jump, R to restart after game over,\n"
+               "A to toggle the autopilot, F3 to toggle the profiler overlay, ESC to quit.")
+    parser.add_argument("--seed", type=seed_arg, default=None,
+                        help="seed for pipes and effects, for a reproducible run")
+    parser.add_argument("--fixed-step", action="store_true",
+                        help="update at a fixed tick rate and render as fast as the display allows")
+    parser.add_argument("--tick-rate", type=int, default=FPS,
+                        help="simulation ticks per second with --fixed-step (default: %(default)s)")
+    parser.add_argument("--max-steps", type=int, default=5,
+                        help="most ticks to catch up per rendered frame (default: %(default)s)")
+    parser.add_argument("--render-fps", type=int, default=0,
+                        help="cap on rendered frames per second with --fixed-step, 0 for none")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw and update only the parts of the screen that changed")
+    parser.add_argument("--quality", choices=[tier.name for tier in QUALITY_TIERS], default=None,
+                        help="lock effects to one quality tier instead of adapting to the frame rate")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="let the lookahead autopilot play, restarting after every crash")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="wait before polling input instead of after the flip, starting a frame "
+                             "as soon as input arrives")
+    parser.add_argument("--measure-latency", action="store_true",
+                        help="time every jump from input to the flip that shows it and report on exit")
+    parser.add_argument("--record", metavar="DIR", default=None,
+                        help="save a replay of every finished game to DIR")
+    parser.add_argument("--capture", metavar="PATH", default=None,
+                        help="record every presented frame as numbered PNGs in directory PATH, or as a "
+                             "raw RGB24 stream if PATH ends in .rgb or .raw, or is - for stdout")
+    parser.add_argument("--capture-policy", choices=FrameCapture.POLICIES, default="drop",
+                        help="when the capture writer falls behind, drop frames or make the game wait "
+                             "(default: %(default)s)")
+    parser.add_argument("--capture-buffers", type=int, default=FrameCapture.BUFFERS,
+                        help="frames the capture can hold while the writer catches up (default: %(default)s)")
+    parser.add_argument("--telemetry", metavar="FILE", default=None,
+                        help="record frame timings and save histograms to FILE (.json or .csv) on exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main game function."""
+    args = parse_args(argv)
+    
+    init_display()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Flappy Game with Sound")
+    clock = pygame.time.Clock()
+    
+    capture = None
+    stdout = sys.stdout
+    if args.capture:
+        try:
+            capture = FrameCapture(args.capture, screen, max(1, args.capture_buffers), args.capture_policy)
+        except OSError as e:
+            print(f"✗ Cannot capture to {args.capture}: {e}")
+        else:
+            if capture.to_stdout:
+                # Keep messages out of the video stream
+                sys.stdout = sys.stderr
+            if capture.stream:
+                print(f"✓ Capturing raw RGB24 frames, encode with: {capture.encoder_hint()}")
+            else:
+                print(f"✓ Capturing PNG frames to {args.capture}")
+    
+    # Initialize sound manager
+    sound_manager = SoundManager()
+    latency = sound_manager.latency_ms()
+    if latency is not None:
+        print(f"✓ Audio ready, ~{latency:.1f} ms estimated output latency")
+    
+    game = Game(screen, sound_manager, args.seed, args.record, args.dirty_rects, args.quality,
+                autopilot=args.autopilot, capture=capture)
+    print(f"Seed: {game.seed}  (SPACE/click: jump, R: restart, A: autopilot, F3: profiler, ESC: quit, "
+          f"--help: custom assets)")
+    if args.telemetry:
+        game.profiler.enabled = True
+    if args.low_latency or args.measure_latency:
+        game.pacer = FramePacer(args.render_fps if args.fixed_step else FPS, args.low_latency)
+    if args.measure_latency:
+        game.latency = LatencyMeter()
+    if args.fixed_step:
+        game.run_fixed(clock, args.tick_rate, args.max_steps, args.render_fps)
+    else:
+        game.run(clock)
+    
+    if args.telemetry:
+        try:
+            game.profiler.save(args.telemetry)
+            print(f"✓ Frame timings saved: {args.telemetry}")
+        except OSError as e:
+            print(f"✗ Failed to save frame timings: {e}")
+    
+    if capture:
+        capture.close()
+        if capture.error:
+            print(f"✗ Capture stopped early: {capture.error}")
+        print(f"Capture: {capture.written} of {capture.frames} frames written, {capture.dropped} dropped")
+    
+    if game.latency:
+        print(f"Input latency: {game.latency.summary()}")
+    
+    autopilot = game.autopilot
+    if autopilot.decisions:
+        print(f"Autopilot: {autopilot.decisions} decisions, {autopilot.microseconds_per_decision():.0f} µs each, "
+              f"{autopilot.overruns} over budget")
+    
+    if sound_manager.triggers:
+        print(f"Audio latency estimate: {sound_manager.latency_ms():.1f} ms over {sound_manager.triggers} sounds")
     
+    # Messages went to stderr while frames were streamed to stdout
+    sys.stdout = stdout
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
-    main()00000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000
\ No newline at end of file
+    main()
@@ -0,0 +1,219 @@
+"""Lookahead autopilot that plays by searching ahead with the game rules.
+
+Before every step the Autopilot searches jump/no-jump sequences by stepping
+the rules of simulation.Bird.update, Pipe.update and check_collision forward
+a few seconds, and answers with the first move of a sequence that survives
+the whole horizon. Pipes that spawn inside the horizon come from a copy of the
+simulation's generator, so the search sees exactly the game that will be
+played. That makes it usable both for attract mode and, given no time budget
+(budget_us=None), as an oracle for whether a seed and set of constants can be
+survived at all. With a budget a lost game only means no way through was found
+in time.
+
+A search node is a (frame, y, velocity) tuple. Pipes only depend on the frame,
+so the vertical ranges they block in the bird's column are worked out once per
+frame and shared by every node. States with no surviving continuation are
+remembered for the rest of the game, since a bird that must crash before one
+horizon must also crash before any later one.
+"""
+import random
+import time
+
+import simulation
+
+
+class OutOfTime(Exception):
+    """Raised inside a search that used up its time budget."""
+
+
+class Autopilot:
+    """Picks jumps by depth-first search over the next few seconds of play.
+    
+    decide(sim) is called before each sim.step() of an active game. Each call
+    searches for at most budget_us microseconds, or without limit when it is
+    None. When a fresh search runs out of time, or finds no sequence that
+    survives, the first move of the longest surviving sequence it did reach is
+    used instead. The previous plan is tried first, so a search usually only
+    has to extend it by one frame.
+    """
+    
+    HORIZON = 180  # Frames searched ahead, three seconds at 60 FPS
+    BUDGET_US = 2000  # Search time per decision
+    CHECK_EVERY = 64  # Nodes between clock checks
+    PRUNE_EVERY = 600  # Frames between dropping cached states from the past
+    TARGET_MARGIN = 10  # Pixels above a gap's floor the search first aims for
+    
+    def __init__(self, horizon=HORIZON, budget_us=BUDGET_US):
+        self.horizon = horizon
+        self.budget = float("inf") if budget_us is None else budget_us / 1e6
+        self.decisions = 0
+        self.nodes = 0
+        self.overruns = 0
+        self.search_time = 0.0
+        self.forget(None)
+    
+    def forget(self, game):
+        """Drop everything cached about the previous game."""
+        self.game = game
+        self.dead = set()
+        self.plan = {}  # frame -> jump, for the best sequence found so far
+        self.states = {}  # frame -> (y, velocity) along that sequence
+        self.columns = {}  # frame -> ((top, bottom), ...) ranges blocked in the bird's column
+        self.targets = {}  # frame -> y the bird should stay above, from the next gap
+        self.pipes = []  # [x, width, top, bottom] as of self.tracked_frame
+        self.tracked_frame = 0
+        self.rng = None
+        self.pruned_frame = 0
+    
+    def track(self, sim):
+        """Start following the pipes of sim's current game."""
+        state = sim.state
+        self.forget(state)
+        self.settings = sim.settings
+        bird = state.bird
+        self.left = int(bird.x)
+        self.right = self.left + bird.width
+        self.height = bird.height
+        self.gravity = bird.gravity
+        self.jump_strength = bird.jump_strength
+        self.ground = simulation.WINDOW_HEIGHT - simulation.GROUND_HEIGHT
+        self.pipes = [[pipe.x, pipe.width, pipe.top_height, pipe.bottom_y + pipe.bottom_height, pipe.bottom_y]
+                      for pipe in state.pipes]
+        self.tracked_frame = state.frame_count
+        # Future pipes are drawn from a copy so the game's own stream is untouched
+        self.rng = random.Random()
+        self.rng.setstate(sim.rng.getstate())
+    
+    def extend_columns(self, frame):
+        """Step the tracked pipes up to frame, recording what blocks the bird."""
+        settings = self.settings
+        pipes = self.pipes
+        left = self.left
+        right = self.right
+        while self.tracked_frame < frame:
+            self.tracked_frame += 1
+            if self.tracked_frame % settings.pipe_frequency == 0:
+                pipe = simulation.Pipe(simulation.WINDOW_WIDTH, self.rng, settings)
+                pipes.append([pipe.x, pipe.width, pipe.top_height,
+                              pipe.bottom_y + pipe.bottom_height, pipe.bottom_y])
+            blocked = []
+            target = None
+            for pipe in pipes[:]:
+                # Same order of operations as Pipe.update() and check_collision()
+                pipe[0] -= settings.pipe_speed
+                x, width, top_height, bottom_end, bottom_y = pipe
+                if x + width < 0:
+                    pipes.remove(pipe)
+                    continue
+                if target is None and x + width >= left:
+                    target = bottom_y - self.height - self.TARGET_MARGIN
+                x = int(x)
+                if width and x < right and x + width > left:
+                    if top_height:
+                        blocked.append((0, top_height))
+                    if bottom_end > bottom_y:
+                        blocked.append((bottom_y, bottom_end))
+            self.columns[self.tracked_frame] = tuple(blocked)
+            self.targets[self.tracked_frame] = self.ground - self.height * 3 if target is None else target
+    
+    def decide(self, sim):
+        """Return True if the bird should jump before the next step."""
+        state = sim.state
+        if state.game_over:
+            return False
+        if state is not self.game:
+            self.track(sim)
+        frame = state.frame_count
+        end = frame + self.horizon
+        self.extend_columns(end)
+        if frame - self.pruned_frame >= self.PRUNE_EVERY:
+            self.prune(frame)
+        
+        bird = state.bird
+        start = time.perf_counter()
+        self.deadline = start + self.budget
+        self.countdown = self.CHECK_EVERY
+        self.root = None  # Set for a fresh search, which tracks its longest sequence
+        self.deepest = end
+        found = True
+        try:
+            # The rules are deterministic, so a plan the bird is still on only
+            # has to grow by the frame that came into the horizon
+            last = self.states.get(end - 1)
+            if self.states.get(frame) != (bird.y, bird.velocity) or last is None \
+                    or not self.search(end - 1, last[0], last[1], end):
+                self.root = frame
+                self.deepest = frame
+                self.fallback = False
+                found = self.search(frame, bird.y, bird.velocity, end)
+        except OutOfTime:
+            self.overruns += 1
+            # Cut short while extending, the plan still holds up to end - 1
+            found = self.root is None
+        self.search_time += time.perf_counter() - start
+        self.decisions += 1
+        # A search cut short leaves moves from an older plan behind, which
+        # need not suit the bird's current state
+        return self.plan.get(frame, False) if found else self.fallback
+    
+    def search(self, frame, y, velocity, end):
+        """Look for a move sequence from this state that survives to end.
+        
+        Records the sequence in self.plan and returns True if there is one.
+        """
+        self.nodes += 1
+        self.countdown -= 1
+        if not self.countdown:
+            self.countdown = self.CHECK_EVERY
+            if time.perf_counter() > self.deadline:
+                raise OutOfTime()
+        
+        following = frame + 1
+        blocked = self.columns[following]
+        preferred = self.plan.get(frame)
+        if preferred is None:
+            # Off the plan, try falling towards the next gap's floor first
+            preferred = velocity > 0 and y > self.targets[following]
+        for jump in (preferred, not preferred):
+            # Same order of operations as Bird.jump() and Bird.update()
+            v = (self.jump_strength if jump else velocity) + self.gravity
+            next_y = y + v
+            if next_y + self.height >= self.ground:
+                continue  # Reaching the ground always counts as a crash
+            top = int(next_y)
+            if top < 0:
+                continue  # The rules allow flying over the pipes off screen; stay in view
+            bottom = top + self.height
+            if any(top < block_bottom and bottom > block_top for block_top, block_bottom in blocked):
+                continue
+            if frame == self.root:
+                self.first = jump
+            if following > self.deepest:
+                self.deepest = following
+                self.fallback = self.first
+            if following >= end:
+                self.states[following] = (next_y, v)
+            elif (following, next_y, v) in self.dead or not self.search(following, next_y, v, end):
+                continue
+            self.plan[frame] = jump
+            self.states[frame] = (y, velocity)
+            return True
+        self.dead.add((frame, y, velocity))
+        return False
+    
+    def prune(self, frame):
+        """Forget cached states and pipe columns from frames already played."""
+        self.pruned_frame = frame
+        self.dead = {node for node in self.dead if node[0] >= frame}
+        self.plan = {f: jump for f, jump in self.plan.items() if f >= frame}
+        self.states = {f: node for f, node in self.states.items() if f >= frame}
+        self.columns = {f: blocked for f, blocked in self.columns.items() if f > frame}
+        self.targets = {f: target for f, target in self.targets.items() if f > frame}
+    
+    def microseconds_per_decision(self):
+        """Get the mean search time per decision."""
+        return self.search_time / self.decisions * 1e6 if self.decisions else 0.0
+    
+    def microseconds_per_node(self):
+        """Get the mean search time per node visited."""
+        return self.search_time / self.nodes * 1e6 if self.nodes else 0.0
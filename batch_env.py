@@ -0,0 +1,138 @@
+"""Vectorized environment that steps a whole population of birds at once.
+
+Every bird flies against the same pipe sequence. Positions, velocities and
+alive flags are NumPy arrays, and each step applies the rules of
+simulation.Simulation to all birds with a handful of array operations, so
+results match the scalar game frame for frame.
+"""
+import random
+
+import numpy as np
+
+import simulation
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, GROUND_HEIGHT, PIPE_GAP
+
+
+class BatchEnv:
+    """Population of birds sharing one pipe sequence.
+    
+    Observations are float rows of (bird y, bird velocity, distance to the
+    next pipe, next pipe top height, next pipe bottom y). Rewards are the
+    points each bird scored during the step and dones flag dead birds.
+    """
+    
+    OBSERVATION_SIZE = 5
+    
+    def __init__(self, num_birds, seed=None):
+        self.num_birds = num_birds
+        self.rng = random.Random(seed)
+        
+        # All birds share the scalar Bird geometry
+        bird = simulation.Bird()
+        self.bird_x = bird.x
+        self.bird_width = bird.width
+        self.bird_height = bird.height
+        self.start_y = bird.y
+        
+        self.y = np.empty(num_birds, dtype=np.float64)
+        self.velocity = np.empty(num_birds, dtype=np.float64)
+        self.alive = np.empty(num_birds, dtype=bool)
+        self.score = np.empty(num_birds, dtype=np.int64)
+        self.frames_alive = np.empty(num_birds, dtype=np.int64)
+        self.reset()
+    
+    def reset(self, seed=None):
+        """Start a new game for every bird. Returns the first observations."""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.y.fill(self.start_y)
+        self.velocity.fill(0)
+        self.alive.fill(True)
+        self.score.fill(0)
+        self.frames_alive.fill(0)
+        self.frame_count = 0
+        self.pipes = []
+        return self.observe()
+    
+    def step(self, actions):
+        """Advance one frame. actions is a bool array, True meaning jump.
+        
+        Returns (observations, rewards, dones).
+        """
+        alive = self.alive
+        y = self.y
+        velocity = self.velocity
+        
+        # Jump, then update physics for birds that are still flying
+        velocity[np.asarray(actions, dtype=bool) & alive] = simulation.JUMP_STRENGTH
+        velocity[alive] += simulation.GRAVITY
+        y[alive] += velocity[alive]
+        
+        # Ground collision
+        floor = WINDOW_HEIGHT - GROUND_HEIGHT - self.bird_height
+        landed = alive & (y > floor)
+        y[landed] = floor
+        velocity[landed] = 0
+        
+        self.frame_count += 1
+        self.frames_alive[alive] += 1
+        
+        # Spawn pipes
+        if self.frame_count % simulation.PIPE_FREQUENCY == 0:
+            self.pipes.append(simulation.Pipe(WINDOW_WIDTH, self.rng))
+        
+        # Update pipes; every bird shares the same x, so passing is scalar
+        rewards = np.zeros(self.num_birds, dtype=np.float64)
+        for pipe in self.pipes[:]:
+            pipe.update()
+            if not pipe.passed and pipe.x + pipe.width < self.bird_x:
+                pipe.passed = True
+                rewards[alive] += 1
+            if pipe.is_off_screen():
+                self.pipes.remove(pipe)
+        self.score += rewards.astype(np.int64)
+        
+        # Check collision, truncating like pygame.Rect
+        top = np.trunc(y)
+        bottom = top + self.bird_height
+        hit = bottom >= WINDOW_HEIGHT - GROUND_HEIGHT
+        for pipe in self.pipes:
+            pipe_x = int(pipe.x)
+            if pipe_x < self.bird_x + self.bird_width and pipe_x + pipe.width > self.bird_x:
+                hit |= (top < pipe.top_height) & (bottom > 0)
+                hit |= (top < pipe.bottom_y + pipe.bottom_height) & (bottom > pipe.bottom_y)
+        alive &= ~hit
+        
+        return self.observe(), rewards, ~alive
+    
+    def next_pipe(self):
+        """Get the first pipe the birds have not flown past yet."""
+        for pipe in self.pipes:
+            if pipe.x + pipe.width >= self.bird_x:
+                return pipe
+        return None
+    
+    def observe(self):
+        """Get a new observation array for the current state.
+        
+        Callers may keep it across steps, for example in a replay buffer.
+        """
+        obs = np.empty((self.num_birds, self.OBSERVATION_SIZE), dtype=np.float64)
+        obs[:, 0] = self.y
+        obs[:, 1] = self.velocity
+        pipe = self.next_pipe()
+        if pipe is None:
+            # Pretend a centered gap sits just past the right edge
+            gap_top = (WINDOW_HEIGHT - GROUND_HEIGHT - PIPE_GAP) // 2
+            obs[:, 2] = WINDOW_WIDTH - self.bird_x
+            obs[:, 3] = gap_top
+            obs[:, 4] = gap_top + PIPE_GAP
+        else:
+            obs[:, 2] = pipe.x - self.bird_x
+            obs[:, 3] = pipe.top_height
+            obs[:, 4] = pipe.bottom_y
+        return obs
+    
+    def done(self):
+        """Check if every bird has crashed."""
+        return not self.alive.any()
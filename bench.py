@@ -0,0 +1,388 @@
+"""Frame-time benchmarks for every render and update stage of the game.
+
+Runs scripted, seeded scenarios through the real Game draw path from 3game.py
+under the SDL dummy video driver and reports the median and p99 time of each
+stage. Results can be written as JSON and compared against a stored baseline;
+any stage that got slower than the tolerance allows makes the run fail.
+
+Cold start is measured too, in fresh interpreters: the time from importing the
+game to its first flipped frame, and from importing replay.py to a stepped
+headless Simulation. Either going over its budget also fails the run.
+
+Usage:
+    python bench.py [--frames N] [--output results.json]
+                    [--baseline baseline.json] [--tolerance 0.25]
+                    [--save-baseline baseline.json] [--scenario NAME ...]
+                    [--startup-runs N] [--dirty-rects]
+"""
+import os
+
+# Must be set before pygame is imported by the game module
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+game = importlib.import_module("3game")
+pygame = game.pygame
+
+from sweep import follow_gap
+
+STAGES = ["update", "sky", "stars", "clouds", "ground", "pipes", "particles", "bird", "text", "flip"]
+
+# A stage only counts as regressed if it is also this much slower in absolute terms
+MIN_REGRESSION_MS = 0.05
+
+# Each snippet runs in a fresh interpreter and prints milliseconds since its first line
+STARTUP_SCRIPTS = {
+    "first_frame": """
+import time
+start = time.perf_counter()
+import importlib
+game = importlib.import_module("3game")
+game.init_display()
+screen = game.pygame.display.set_mode((game.WINDOW_WIDTH, game.WINDOW_HEIGHT))
+g = game.Game(screen, game.SoundManager(), 1)
+g.handle_events()
+g.update()
+g.draw()
+game.pygame.display.flip()
+print((time.perf_counter() - start) * 1000)
+""",
+    "headless_ready": """
+import time
+start = time.perf_counter()
+import replay
+sim = replay.simulation.Simulation(1)
+sim.start()
+sim.step()
+print((time.perf_counter() - start) * 1000)
+""",
+}
+
+# Median cold start allowed for each startup stage
+STARTUP_BUDGET_MS = {
+    "first_frame": 500,
+    "headless_ready": 100,
+}
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+# Scenarios: setup(game) prepares the state, tick(game, frame) advances it.
+
+def setup_idle(g):
+    """Title screen with only stars and clouds moving."""
+
+
+def tick_idle(g, frame):
+    g.update()
+
+
+def setup_dense_pipes(g):
+    """Active game with a pipe every 65 pixels across the screen."""
+    g.sim.start()
+    state = g.sim.state
+    for x in range(0, game.WINDOW_WIDTH + 65, 65):
+        state.pipes.append(g.make_pipe(x, g.sim.rng, g.sim.settings))
+
+
+def tick_dense_pipes(g, frame):
+    # Scroll and wrap the pipes without the rules, so the bird never crashes
+    state = g.sim.state
+    if follow_gap(state):
+        state.bird.jump()
+    state.bird.update()
+    state.bird.y = min(state.bird.y, 300)
+    state.frame_count += 1
+    for pipe in state.pipes:
+        pipe.update()
+        if pipe.is_off_screen():
+            pipe.x += game.WINDOW_WIDTH + 65
+            pipe.prev_x = pipe.x
+    g.particles.update()
+    for layer in g.ambient:
+        layer.update(False)
+
+
+def setup_particle_storm(g):
+    """Active game with a burst of particles every frame."""
+    g.sim.start()
+
+
+def tick_particle_storm(g, frame):
+    if follow_gap(g.sim.state):
+        g.sim.flap()
+    g.update()
+    g.particles.burst(200 + (frame * 37) % 150 - 75, 250 + (frame * 53) % 150 - 75, 60)
+
+
+# (depth, stars, clouds) for a busy three-layer night sky
+NIGHT_SKY = [(0.0, 300, 10), (0.3, 200, 12), (0.7, 100, 8)]
+
+
+def setup_night_sky(g):
+    """Active game under hundreds of stars and clouds at three parallax depths."""
+    g.ambient = [game.AmbientLayer(stars, clouds, depth, g.rng) for depth, stars, clouds in NIGHT_SKY]
+    g.sim.start()
+
+
+def tick_night_sky(g, frame):
+    if follow_gap(g.sim.state):
+        g.sim.flap()
+    g.update()
+
+
+def setup_game_over(g):
+    """Game over overlay after the bird has crashed."""
+    g.sim.start()
+    while not g.sim.state.game_over:
+        g.update()
+
+
+def tick_game_over(g, frame):
+    g.update()
+
+
+def make_custom_images(directory):
+    """Write a round character.png and an irregular obstacle.png."""
+    character = pygame.Surface((64, 64), pygame.SRCALPHA)
+    pygame.draw.circle(character, (255, 120, 40, 255), (32, 32), 30)
+    pygame.draw.circle(character, (255, 255, 255, 255), (44, 24), 8)
+    pygame.image.save(character, os.path.join(directory, "character.png"))
+    
+    obstacle = pygame.Surface((48, 128), pygame.SRCALPHA)
+    pygame.draw.polygon(obstacle, (90, 160, 70, 255), [(4, 0), (44, 0), (40, 128), (8, 128)])
+    pygame.draw.circle(obstacle, (60, 120, 50, 200), (24, 64), 16)
+    pygame.image.save(obstacle, os.path.join(directory, "obstacle.png"))
+
+
+def setup_custom_images(g):
+    """Dense pipes drawn with custom character and obstacle images."""
+    setup_dense_pipes(g)
+
+
+SCENARIOS = {
+    "idle": (setup_idle, tick_idle, False),
+    "dense_pipes": (setup_dense_pipes, tick_dense_pipes, False),
+    "particle_storm": (setup_particle_storm, tick_particle_storm, False),
+    "custom_images": (setup_custom_images, tick_dense_pipes, True),
+    "game_over": (setup_game_over, tick_game_over, False),
+    "night_sky": (setup_night_sky, tick_night_sky, False),
+}
+
+
+def run_scenario(name, screen, frames, warmup, seed, dirty_rects=False):
+    """Run one scenario and return {stage: [milliseconds per frame]}."""
+    setup, tick, custom_images = SCENARIOS[name]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # Game looks for custom images in the working directory
+        os.chdir(directory)
+        try:
+            if custom_images:
+                make_custom_images(directory)
+            g = game.Game(screen, game.SoundManager(), seed, dirty_rects=dirty_rects)
+            # Time the cached images, not the background load
+            game.assets.wait()
+            g.refresh_assets()
+            setup(g)
+            g.sim.pop_events()
+            return time_frames(g, tick, frames, warmup)
+        finally:
+            os.chdir(cwd)
+
+
+def measure_startup(runs):
+    """Time every startup script in `runs` fresh interpreters.
+    
+    Returns {stage: [milliseconds per run]}.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    timings = {}
+    for stage, script in STARTUP_SCRIPTS.items():
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, "-c", script], cwd=directory,
+                                    capture_output=True, text=True, check=True).stdout
+            samples.append(float(output.split()[-1]))
+        timings[stage] = samples
+    return timings
+
+
+def over_budget(startup):
+    """List (stage, budget, median) for every startup stage over its budget."""
+    return [(stage, STARTUP_BUDGET_MS[stage], metrics["median_ms"])
+            for stage, metrics in startup.items()
+            if metrics["median_ms"] > STARTUP_BUDGET_MS[stage]]
+
+
+def time_frames(g, tick, frames, warmup):
+    """Time every stage of `frames` frames after `warmup` untimed ones.
+    
+    In dirty-rectangle mode the layer stages only build their blits, and
+    drawing the changed parts is timed as a separate "repaint" stage.
+    """
+    renderer = g.renderer
+    stages = STAGES + ["repaint"] if renderer else STAGES
+    timings = {stage: [] for stage in stages}
+    clock = time.perf_counter
+    screen = g.screen
+    for frame in range(warmup + frames):
+        pygame.event.pump()
+        start = clock()
+        tick(g, frame)
+        g.sim.pop_events()
+        samples = [("update", clock() - start)]
+        layers = []
+        for stage_name, layer in g.layers:
+            start = clock()
+            blits = layer(1.0)
+            if renderer:
+                layers.append(blits)
+            else:
+                screen.blits(blits, False)
+            samples.append((stage_name, clock() - start))
+        rects = None
+        if renderer:
+            start = clock()
+            rects = renderer.render(screen, layers)
+            samples.append(("repaint", clock() - start))
+        start = clock()
+        g.present(rects)
+        samples.append(("flip", clock() - start))
+        if frame >= warmup:
+            for stage_name, seconds in samples:
+                timings[stage_name].append(seconds * 1000)
+    return timings
+
+
+def summarize(timings, total=True):
+    """Reduce per-frame samples to median and p99 milliseconds."""
+    summary = {}
+    for stage, samples in timings.items():
+        summary[stage] = {
+            "median_ms": round(percentile(samples, 0.5), 4),
+            "p99_ms": round(percentile(samples, 0.99), 4),
+        }
+    if not total:
+        return summary
+    totals = [sum(frame) for frame in zip(*timings.values())]
+    summary["frame"] = {
+        "median_ms": round(percentile(totals, 0.5), 4),
+        "p99_ms": round(percentile(totals, 0.99), 4),
+    }
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    """List (scenario, stage, metric, baseline, current) for every regression."""
+    regressions = []
+    for scenario, stages in results["scenarios"].items():
+        base_stages = baseline.get("scenarios", {}).get(scenario)
+        if not base_stages:
+            continue
+        for stage, metrics in stages.items():
+            base_metrics = base_stages.get(stage)
+            if not base_metrics:
+                continue
+            for metric in ("median_ms", "p99_ms"):
+                before = base_metrics[metric]
+                after = metrics[metric]
+                if after > before * (1 + tolerance) and after - before > MIN_REGRESSION_MS:
+                    regressions.append((scenario, stage, metric, before, after))
+    return regressions
+
+
+def print_table(results):
+    """Print a median/p99 table per scenario."""
+    for scenario, stages in results["scenarios"].items():
+        print(f"\n{scenario}")
+        print(f"  {'stage':<14} {'median ms':>10} {'p99 ms':>10}")
+        for stage, metrics in stages.items():
+            print(f"  {stage:<14} {metrics['median_ms']:>10.3f} {metrics['p99_ms']:>10.3f}")
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark every render and update stage.")
+    parser.add_argument("--frames", type=int, default=600, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=60, help="untimed frames to fill caches")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results from this JSON file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="also write results here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline (default: %(default)s)")
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="fresh interpreters per startup measurement, 0 to skip (default: %(default)s)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="benchmark the dirty-rectangle renderer instead of full redraws")
+    args = parser.parse_args(argv)
+    
+    game.init_display()
+    screen = pygame.display.set_mode((game.WINDOW_WIDTH, game.WINDOW_HEIGHT))
+    results = {
+        "meta": {
+            "frames": args.frames,
+            "seed": args.seed,
+            "dirty_rects": args.dirty_rects,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+    for name in args.scenario or list(SCENARIOS):
+        timings = run_scenario(name, screen, args.frames, args.warmup, args.seed, args.dirty_rects)
+        results["scenarios"][name] = summarize(timings)
+    if args.startup_runs:
+        results["scenarios"]["startup"] = summarize(measure_startup(args.startup_runs), total=False)
+    print_table(results)
+    
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"\nResults written to {path}")
+    
+    status = 0
+    if args.startup_runs:
+        late = over_budget(results["scenarios"]["startup"])
+        if late:
+            print(f"\nOVER BUDGET: {len(late)} startup stages")
+            for stage, budget, median in late:
+                print(f"  startup/{stage}: {median:.1f} ms, budget {budget} ms")
+            status = 1
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSION: {len(regressions)} stage metrics slower than baseline by more than {args.tolerance:.0%}")
+            for scenario, stage, metric, before, after in regressions:
+                print(f"  {scenario}/{stage} {metric}: {before:.3f} -> {after:.3f} ms")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
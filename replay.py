@@ -0,0 +1,200 @@
+"""Compact binary replays and a headless verifier for them.
+
+A replay stores the game seed plus the frame index of every jump, which is
+all simulation.Simulation needs to reproduce a game exactly. The claimed
+score and frame count are stored too so the verifier can check them.
+
+File layout (little endian):
+    4s  magic b"FLRP"
+    B   format version
+    q   seed
+    I   claimed score
+    I   claimed frame count
+    I   number of jumps
+    ... jump frames, each as an unsigned LEB128 delta from the previous one
+
+Usage:
+    python replay.py FILE_OR_DIR [FILE_OR_DIR ...] [--jobs N]
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import Pool
+
+import simulation
+
+MAGIC = b"FLRP"
+VERSION = 1
+EXTENSION = ".replay"
+HEADER = struct.Struct("<4sBqIII")
+# The seed is stored as a signed 64-bit "q"
+MIN_SEED = -2**63
+MAX_SEED = 2**63 - 1
+
+Replay = namedtuple("Replay", "seed jumps score frames")
+Result = namedtuple("Result", "path ok score frames error")
+
+
+class ReplayError(ValueError):
+    """Raised when a replay file cannot be decoded."""
+
+
+def from_state(seed, state):
+    """Build a replay from a finished simulation.GameState."""
+    return Replay(seed, list(state.jumps), state.score, state.frame_count)
+
+
+def encode(replay):
+    """Serialize a replay to bytes."""
+    out = bytearray(HEADER.pack(MAGIC, VERSION, replay.seed, replay.score,
+                                replay.frames, len(replay.jumps)))
+    previous = 0
+    for frame in replay.jumps:
+        delta = frame - previous
+        if delta < 0:
+            raise ValueError("jump frames must be in order")
+        previous = frame
+        while delta >= 0x80:
+            out.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode(data):
+    """Parse bytes produced by encode()."""
+    if len(data) < HEADER.size:
+        raise ReplayError("truncated header")
+    magic, version, seed, score, frames, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ReplayError("not a replay file")
+    if version != VERSION:
+        raise ReplayError(f"unsupported replay version {version}")
+    
+    jumps = []
+    frame = 0
+    pos = HEADER.size
+    end = len(data)
+    for _ in range(count):
+        delta = 0
+        shift = 0
+        while True:
+            if pos >= end:
+                raise ReplayError("truncated jump list")
+            byte = data[pos]
+            pos += 1
+            delta |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        frame += delta
+        jumps.append(frame)
+    if pos != end:
+        raise ReplayError("trailing data after jump list")
+    return Replay(seed, jumps, score, frames)
+
+
+def save(path, replay):
+    """Write a replay file."""
+    with open(path, "wb") as f:
+        f.write(encode(replay))
+
+
+def load(path):
+    """Read a replay file."""
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+def simulate(replay):
+    """Re-play the recorded jumps headless. Returns the final GameState.
+    
+    Raises ReplayError if a jump lands after the game has already ended.
+    """
+    sim = simulation.Simulation(replay.seed)
+    sim.start()
+    state = sim.state
+    for frame in replay.jumps:
+        if frame > state.frame_count:
+            sim.step(frame - state.frame_count)
+        if state.frame_count != frame or not sim.flap():
+            raise ReplayError(f"jump at frame {frame} after the game ended")
+        sim.events.clear()
+    # Let the bird fall until it crashes
+    while sim.step(simulation.FPS):
+        sim.events.clear()
+    return state
+
+
+def verify(replay, path=None):
+    """Check a replay's claimed score and frame count against a re-simulation."""
+    try:
+        state = simulate(replay)
+    except ReplayError as e:
+        return Result(path, False, None, None, str(e))
+    ok = state.score == replay.score and state.frame_count == replay.frames
+    error = None if ok else f"claimed score {replay.score} in {replay.frames} frames"
+    return Result(path, ok, state.score, state.frame_count, error)
+
+
+def verify_file(path):
+    """Load and verify one replay file."""
+    try:
+        replay = load(path)
+    except (OSError, ReplayError) as e:
+        return Result(path, False, None, None, str(e))
+    return verify(replay, path)
+
+
+def iter_paths(paths):
+    """Expand directories into the replay files inside them."""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(EXTENSION):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def verify_files(paths, jobs=1):
+    """Verify many replay files, yielding a Result for each as it finishes."""
+    paths = iter_paths(paths)
+    if jobs == 1:
+        for path in paths:
+            yield verify_file(path)
+        return
+    with Pool(jobs) as pool:
+        yield from pool.imap(verify_file, paths, chunksize=16)
+
+
+def main(argv=None):
+    """Verify replay files from the command line."""
+    parser = argparse.ArgumentParser(description="Verify flappy game replays headless.")
+    parser.add_argument("paths", nargs="+", help="replay files or directories of them")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    
+    checked = failed = frames = 0
+    start = time.perf_counter()
+    for result in verify_files(args.paths, args.jobs):
+        checked += 1
+        if result.ok:
+            print(f"OK    {result.path}  score={result.score} frames={result.frames}")
+            frames += result.frames
+        else:
+            failed += 1
+            print(f"FAIL  {result.path}  score={result.score} frames={result.frames}  {result.error}")
+    elapsed = time.perf_counter() - start
+    
+    speedup = frames / simulation.FPS / elapsed if elapsed else 0
+    print(f"\n{checked} replays, {failed} failed, {elapsed:.2f}s ({speedup:.0f}x real time)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Headless game rules for the flappy game.
+
+Everything in here is plain Python with no pygame dependency, so the game can
+be stepped without a window, audio or frame limiter. 3game.py renders on top
+of the same Simulation.
+"""
+import bisect
+import random
+from collections import namedtuple
+
+# Game Constants
+WINDOW_WIDTH = 400
+WINDOW_HEIGHT = 600
+GROUND_HEIGHT = 100
+FPS = 60
+
+# Game Settings
+GRAVITY = 0.5
+JUMP_STRENGTH = -10
+PIPE_SPEED = 3
+PIPE_GAP = 150
+PIPE_FREQUENCY = 90
+
+# Physics constants for one game. Pass a Settings to Simulation to play with
+# other values; the module constants above are only the defaults.
+Settings = namedtuple("Settings", "gravity jump_strength pipe_speed pipe_gap pipe_frequency")
+DEFAULT_SETTINGS = Settings(GRAVITY, JUMP_STRENGTH, PIPE_SPEED, PIPE_GAP, PIPE_FREQUENCY)
+
+# Events reported by Simulation
+EVENT_JUMP = "jump"
+EVENT_POINT = "point"
+EVENT_HIT = "hit"
+
+
+class Bird:
+    """Player character physics."""
+    
+    __slots__ = ("x", "y", "width", "height", "velocity", "rotation", "gravity", "jump_strength")
+    
+    def __init__(self, settings=DEFAULT_SETTINGS):
+        self.gravity = settings.gravity
+        self.jump_strength = settings.jump_strength
+        self.x = 80
+        self.y = 250
+        self.width = 40
+        self.height = 40
+        self.velocity = 0
+        self.rotation = 0
+    
+    def jump(self):
+        """Make the character jump."""
+        self.velocity = self.jump_strength
+    
+    def update(self):
+        """Update character physics."""
+        self.velocity += self.gravity
+        self.y += self.velocity
+        
+        # Update rotation
+        self.rotation = min(max(self.velocity * 3, -30), 90)
+        
+        # Ground collision
+        if self.y > WINDOW_HEIGHT - GROUND_HEIGHT - self.height:
+            self.y = WINDOW_HEIGHT - GROUND_HEIGHT - self.height
+            self.velocity = 0
+    
+    def center(self):
+        """Get the center point of the character."""
+        return (self.x + self.width//2, self.y + self.height//2)
+
+
+class Pipe:
+    """Obstacle pipe physics."""
+    
+    __slots__ = ("x", "width", "top_height", "bottom_y", "bottom_height", "passed", "speed")
+    
+    def __init__(self, x, rng=random, settings=DEFAULT_SETTINGS):
+        self.x = x
+        self.width = 60
+        self.speed = settings.pipe_speed
+        
+        # Random height for top pipe
+        self.top_height = rng.randint(50, WINDOW_HEIGHT - 200 - settings.pipe_gap)
+        self.bottom_y = self.top_height + settings.pipe_gap
+        self.bottom_height = WINDOW_HEIGHT - GROUND_HEIGHT - self.bottom_y
+        
+        self.passed = False
+    
+    def update(self):
+        """Move pipe left."""
+        self.x -= self.speed
+    
+    def is_off_screen(self):
+        """Check if pipe is off screen."""
+        return self.x + self.width < 0
+
+
+def check_collision(bird, pipes, start=0):
+    """Check if bird collides with pipes or the ground.
+    
+    pipes must be in x-order, which spawning at the right edge and scrolling
+    at one speed keeps them in. Only the pipes overlapping the bird's column,
+    from index start on, are tested. Boxes follow pygame.Rect.colliderect:
+    coordinates are truncated to ints and empty boxes never collide.
+    """
+    # Check ground collision
+    if bird.y + bird.height >= WINDOW_HEIGHT - GROUND_HEIGHT:
+        return True
+    
+    width = bird.width
+    height = bird.height
+    if not (width and height):
+        return False
+    left = int(bird.x)
+    top = int(bird.y)
+    right = left + width
+    bottom = top + height
+    for index in range(start, len(pipes)):
+        pipe = pipes[index]
+        x = int(pipe.x)
+        if x >= right:
+            break
+        if x + pipe.width <= left or not pipe.width:
+            continue
+        if pipe.top_height and top < pipe.top_height and bottom > 0:
+            return True
+        if pipe.bottom_height and top < pipe.bottom_y + pipe.bottom_height and bottom > pipe.bottom_y:
+            return True
+    return False
+
+
+def check_collisions(birds, pipes, collision=check_collision):
+    """Check many birds against one x-ordered pipe list. Returns a list of bools.
+    
+    A bisect over the pipes' right edges finds each bird's first candidate
+    pipe, so stress modes with many obstacles stay cheap per bird.
+    """
+    edges = [int(pipe.x) + pipe.width for pipe in pipes]
+    return [collision(bird, pipes, bisect.bisect_right(edges, int(bird.x))) for bird in birds]
+
+
+class GameState:
+    """Everything that changes while a game is played."""
+    
+    __slots__ = ("bird", "pipes", "score", "frame_count", "game_active", "game_over", "jumps")
+    
+    def __init__(self, bird):
+        self.bird = bird
+        self.pipes = []
+        self.jumps = []  # frame_count at every accepted jump, for replays
+        self.score = 0
+        self.frame_count = 0
+        self.game_active = False
+        self.game_over = False
+
+
+class Simulation:
+    """Steps the game rules one frame at a time without any display.
+    
+    bird_factory(settings) and pipe_factory(x, rng, settings) let a renderer
+    swap in drawable subclasses of Bird and Pipe, and collision(bird, pipes) a
+    finer collision test with the same signature as check_collision(). Events
+    from flap() and step() are queued in self.events until pop_events() is
+    called.
+    """
+    
+    def __init__(self, seed=None, bird_factory=Bird, pipe_factory=Pipe, collision=check_collision,
+                 settings=DEFAULT_SETTINGS):
+        self.bird_factory = bird_factory
+        self.pipe_factory = pipe_factory
+        self.collision = collision
+        self.settings = settings
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.events = []
+        self.state = GameState(bird_factory(settings))
+    
+    def reset(self, seed=None):
+        """Start a fresh game, reseeding the pipe generator if a seed is given."""
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+        self.events = []
+        self.state = GameState(self.bird_factory(self.settings))
+    
+    def start(self):
+        """Start the game without jumping."""
+        self.state.game_active = True
+    
+    def flap(self):
+        """Handle a jump input. Returns True if the bird jumped."""
+        state = self.state
+        if state.game_over:
+            return False
+        if not state.game_active:
+            state.game_active = True
+        state.bird.jump()
+        state.jumps.append(state.frame_count)
+        self.events.append(EVENT_JUMP)
+        return True
+    
+    def step(self, frames=1):
+        """Advance up to `frames` frames. Returns the number of frames played."""
+        state = self.state
+        bird = state.bird
+        pipes = state.pipes
+        collision = self.collision
+        settings = self.settings
+        frequency = settings.pipe_frequency
+        played = 0
+        while played < frames and state.game_active and not state.game_over:
+            played += 1
+            state.frame_count += 1
+            
+            # Update bird
+            bird.update()
+            
+            # Spawn pipes
+            if state.frame_count % frequency == 0:
+                pipes.append(self.pipe_factory(WINDOW_WIDTH, self.rng, settings))
+            
+            # Update pipes
+            for pipe in pipes[:]:
+                pipe.update()
+                
+                # Check if passed
+                if not pipe.passed and pipe.x + pipe.width < bird.x:
+                    pipe.passed = True
+                    state.score += 1
+                    self.events.append(EVENT_POINT)
+                
+                # Remove off-screen pipes
+                if pipe.is_off_screen():
+                    pipes.remove(pipe)
+            
+            # Check collision
+            if collision(bird, pipes):
+                state.game_over = True
+                self.events.append(EVENT_HIT)
+        return played
+    
+    def play(self, policy, max_frames=None):
+        """Play one game headless, asking policy(state) each frame whether to jump.
+        
+        Returns the finished GameState.
+        """
+        state = self.state
+        self.start()
+        while not state.game_over:
+            if max_frames is not None and state.frame_count >= max_frames:
+                break
+            if policy(state):
+                self.flap()
+            self.step()
+        self.events = []
+        return state
+    
+    def pop_events(self):
+        """Get and clear the events queued since the last call."""
+        events = self.events
+        self.events = []
+        return events
@@ -0,0 +1,252 @@
+"""Headless seed and physics-constant sweeps across a process pool.
+
+Plays seeded games with simulation.Simulation, asking a policy every frame
+whether to jump. Every combination of the swept constants is played with the
+same seeds. Per-game results (score, frames survived, cause of death) stream
+back as workers finish them and are aggregated into one report row per
+combination. The constants reach the workers as a simulation.Settings inside
+each task; module globals are never patched.
+
+A policy is a function policy(state) -> bool, given the GameState before each
+frame. Name one of the built-in POLICIES or any importable MODULE:FUNCTION.
+
+Usage:
+    python sweep.py [--games N] [--first-seed N] [--policy NAME]
+                    [--set NAME=V1,V2,... ...] [--max-frames N] [--jobs N]
+                    [--output results.jsonl]
+
+Example:
+    python sweep.py --games 2000 --set gravity=0.4,0.5,0.6 --set pipe_gap=130,150
+"""
+import argparse
+import functools
+import importlib
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter, namedtuple
+from multiprocessing import Pool
+
+import simulation
+
+# Why a game ended
+CAUSE_GROUND = "ground"
+CAUSE_PIPE = "pipe"
+CAUSE_TIMEOUT = "timeout"
+CAUSES = (CAUSE_GROUND, CAUSE_PIPE, CAUSE_TIMEOUT)
+
+# Constants that must stay whole numbers for randint() and the spawn modulo
+INTEGER_SETTINGS = ("pipe_gap", "pipe_frequency")
+
+GameResult = namedtuple("GameResult", "settings seed score frames cause")
+
+
+def never(state):
+    """Never jump."""
+    return False
+
+
+def follow_gap(state):
+    """Jump whenever the bird drops below the middle of the next gap."""
+    bird = state.bird
+    target = 250
+    for pipe in state.pipes:
+        if pipe.x + pipe.width >= bird.x:
+            target = pipe.bottom_y - 50
+            break
+    return bird.y > target and bird.velocity > 0
+
+
+POLICIES = {
+    "never": never,
+    "follow-gap": follow_gap,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_policy(name):
+    """Look up a built-in policy or import one given as MODULE:FUNCTION."""
+    if name in POLICIES:
+        return POLICIES[name]
+    module, sep, function = name.partition(":")
+    if not sep:
+        raise ValueError(f"unknown policy {name!r}, expected one of {', '.join(POLICIES)} or MODULE:FUNCTION")
+    return getattr(importlib.import_module(module), function)
+
+
+def play_game(task, policy="follow-gap", max_frames=None):
+    """Play one (settings, seed) task headless. Returns a GameResult."""
+    settings, seed = task
+    sim = simulation.Simulation(seed, settings=settings)
+    state = sim.play(load_policy(policy), max_frames)
+    bird = state.bird
+    if not state.game_over:
+        cause = CAUSE_TIMEOUT
+    elif bird.y + bird.height >= simulation.WINDOW_HEIGHT - simulation.GROUND_HEIGHT:
+        cause = CAUSE_GROUND
+    else:
+        cause = CAUSE_PIPE
+    return GameResult(settings, seed, state.score, state.frame_count, cause)
+
+
+def settings_grid(values):
+    """Expand {field: [values]} into every Settings combination, in order."""
+    names = list(values)
+    return [simulation.DEFAULT_SETTINGS._replace(**dict(zip(names, combination)))
+            for combination in itertools.product(*(values[name] for name in names))]
+
+
+def play_games(grid, seeds, policy="follow-gap", max_frames=None, jobs=1):
+    """Play every seed under every Settings, yielding GameResults as they finish.
+    
+    With more than one job the results arrive in completion order, not in
+    task order.
+    """
+    tasks = [(settings, seed) for settings in grid for seed in seeds]
+    play = functools.partial(play_game, policy=policy, max_frames=max_frames)
+    if jobs == 1:
+        for task in tasks:
+            yield play(task)
+        return
+    # Several chunks per worker keep the pool busy when game lengths vary a lot
+    chunksize = max(1, min(64, len(tasks) // (jobs * 8)))
+    with Pool(jobs) as pool:
+        yield from pool.imap_unordered(play, tasks, chunksize=chunksize)
+
+
+class Report:
+    """Aggregates GameResults per Settings."""
+    
+    def __init__(self, grid):
+        self.grid = grid
+        self.scores = {settings: [] for settings in grid}
+        self.frames = {settings: 0 for settings in grid}
+        self.causes = {settings: Counter() for settings in grid}
+    
+    def add(self, result):
+        """Count one finished game."""
+        self.scores[result.settings].append(result.score)
+        self.frames[result.settings] += result.frames
+        self.causes[result.settings][result.cause] += 1
+    
+    def total_frames(self):
+        """Get the frames played across every game so far."""
+        return sum(self.frames.values())
+    
+    def rows(self):
+        """Get one summary dict per Settings, in grid order."""
+        rows = []
+        for settings in self.grid:
+            scores = self.scores[settings]
+            games = len(scores)
+            rows.append({
+                "settings": settings._asdict(),
+                "games": games,
+                "mean_score": statistics.fmean(scores) if games else 0.0,
+                "median_score": statistics.median(scores) if games else 0,
+                "max_score": max(scores, default=0),
+                "mean_frames": self.frames[settings] / games if games else 0.0,
+                "causes": {cause: self.causes[settings][cause] for cause in CAUSES},
+            })
+        return rows
+    
+    def print_table(self, swept):
+        """Print the summary, with a column for each swept constant."""
+        header = "".join(f"{name:>15}" for name in swept)
+        header += f"{'games':>8}{'mean':>9}{'median':>8}{'max':>7}{'frames':>10}"
+        header += "".join(f"{cause:>9}" for cause in CAUSES)
+        print(header)
+        for row in self.rows():
+            line = "".join(f"{row['settings'][name]:>15}" for name in swept)
+            line += (f"{row['games']:>8}{row['mean_score']:>9.2f}{row['median_score']:>8g}"
+                     f"{row['max_score']:>7}{row['mean_frames']:>10.0f}")
+            for cause in CAUSES:
+                share = row["causes"][cause] / row["games"] if row["games"] else 0
+                line += f"{share:>9.0%}"
+            print(line)
+
+
+def parse_value(name, text):
+    """Parse one swept value, keeping whole-number constants as ints."""
+    value = float(text)
+    if value.is_integer():
+        value = int(value)
+    elif name in INTEGER_SETTINGS:
+        raise ValueError(f"{name} must be a whole number, got {text}")
+    if name == "pipe_frequency" and value <= 0:
+        raise ValueError("pipe_frequency must be positive")
+    if name == "pipe_gap" and not 0 < value <= simulation.WINDOW_HEIGHT - 250:
+        raise ValueError(f"pipe_gap must be between 1 and {simulation.WINDOW_HEIGHT - 250}")
+    return value
+
+
+def parse_sweeps(parser, specs):
+    """Turn --set NAME=V1,V2 options into an ordered {field: [values]} dict."""
+    values = {}
+    for spec in specs:
+        name, sep, text = spec.partition("=")
+        name = name.strip().lower()
+        if not sep or name not in simulation.Settings._fields:
+            parser.error(f"--set expects NAME=V1,V2,... with NAME one of {', '.join(simulation.Settings._fields)}")
+        try:
+            values[name] = [parse_value(name, item) for item in text.split(",") if item.strip()]
+        except ValueError as e:
+            parser.error(str(e))
+        if not values[name]:
+            parser.error(f"no values given for {name}")
+    return values
+
+
+def main(argv=None):
+    """Run a sweep from the command line."""
+    parser = argparse.ArgumentParser(description="Play seeded headless games across every CPU.")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="seeds to play for every combination of constants (default: 1000)")
+    parser.add_argument("--first-seed", type=int, default=0, help="first seed to play (default: 0)")
+    parser.add_argument("--policy", default="follow-gap",
+                        help=f"{', '.join(POLICIES)} or MODULE:FUNCTION (default: follow-gap)")
+    parser.add_argument("--set", dest="sweeps", action="append", default=[], metavar="NAME=V1,V2",
+                        help="sweep a physics constant over the given values; may be repeated")
+    parser.add_argument("--max-frames", type=int, default=simulation.FPS * 600,
+                        help="end a game as a timeout after this many frames (default: ten minutes)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", help="write every game's result to this file as JSON lines")
+    args = parser.parse_args(argv)
+    
+    try:
+        load_policy(args.policy)
+    except (ImportError, AttributeError, ValueError) as e:
+        parser.error(f"cannot load policy {args.policy}: {e}")
+    values = parse_sweeps(parser, args.sweeps)
+    grid = settings_grid(values)
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    report = Report(grid)
+    
+    output = open(args.output, "w") if args.output else None
+    start = time.perf_counter()
+    try:
+        for result in play_games(grid, seeds, args.policy, args.max_frames, max(1, args.jobs)):
+            report.add(result)
+            if output:
+                record = result._replace(settings=result.settings._asdict())._asdict()
+                output.write(json.dumps(record) + "\n")
+    finally:
+        if output:
+            output.close()
+    elapsed = time.perf_counter() - start
+    
+    report.print_table(list(values) or ["gravity"])
+    games = len(grid) * len(seeds)
+    frames = report.total_frames()
+    speedup = frames / simulation.FPS / elapsed if elapsed else 0
+    print(f"\n{games} games, {frames} frames, {elapsed:.2f}s "
+          f"({games / elapsed if elapsed else 0:.0f} games/s, {speedup:.0f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())